@@ -0,0 +1,108 @@
+"""Measure the import time of mypy_tools modules in fresh interpreters.
+
+Each module is imported in a new `python -X importtime` process several times and the
+median cumulative time is reported. Light modules are also checked for heavy
+dependencies; the script exits non-zero if one is loaded or a module goes over its
+time budget, so it can run in CI.
+
+Usage:
+    python benchmarks/bench_import.py --repeat 5
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+from tabulate import tabulate
+
+# module -> (time budget in ms or None, dependencies it must not load)
+MODULES = {
+    "mypy_tools": (50, ("numpy", "pandas", "matplotlib", "qcportal", "qcelemental")),
+    "mypy_tools.misc.math": (
+        300,
+        ("pandas", "matplotlib", "qcportal", "qcelemental", "tabulate"),
+    ),
+    "mypy_tools.misc.slurm": (50, ("numpy", "pandas", "matplotlib", "qcportal")),
+    "mypy_tools.psi": (50, ("numpy", "pandas", "matplotlib", "qcportal")),
+    "mypy_tools.qca.instrument": (50, ("numpy", "qcportal", "qcelemental")),
+    "mypy_tools.misc.massif": (None, ("pandas", "matplotlib")),
+    "mypy_tools.qca.base": (None, ()),
+}
+
+
+def import_time(module: str) -> tuple[float, set[str]]:
+    """Import a module in a fresh interpreter.
+
+    Returns:
+        Cumulative import time in ms and the names of all modules it loaded
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    loaded = set()
+    cumulative = 0.0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line[len("import time:") :].split("|")
+        if not cum.strip().isdigit():  # header
+            continue
+        name = name.strip()
+        loaded.add(name)
+        if name == module:
+            cumulative = int(cum) / 1000
+    return cumulative, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("modules", nargs="*", default=list(MODULES))
+    args = parser.parse_args()
+
+    rows = []
+    failed = False
+    for module in args.modules:
+        budget, forbidden = MODULES.get(module, (None, ()))
+        times = []
+        for _ in range(args.repeat):
+            ms, loaded = import_time(module)
+            times.append(ms)
+        median = statistics.median(times)
+
+        heavy = sorted(dep for dep in forbidden if dep in loaded)
+        over = budget is not None and median > budget
+        failed |= bool(heavy) or over
+        rows.append(
+            [
+                module,
+                f"{median:.1f}",
+                f"{min(times):.1f}",
+                "-" if budget is None else budget,
+                ", ".join(heavy),
+                "FAIL" if heavy or over else "ok",
+            ]
+        )
+
+    print(
+        tabulate(
+            rows,
+            headers=[
+                "module",
+                "median (ms)",
+                "min (ms)",
+                "budget (ms)",
+                "heavy deps loaded",
+                "",
+            ],
+        )
+    )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""Benchmark the misc parsers and converters against synthetic inputs.
+
+Covers massif_to_pkl (synthetic massif.out files), read_sacct (a fake `sacct` put on
+PATH), convert_time, convert_memory and avg_radius/avg_radius_batch (random geometry
+batches). Each case reports wall time, throughput and peak traced memory, and is
+compared against the stored baseline in baselines/misc.json.
+
+Usage:
+    python benchmarks/bench_misc.py                 # run and compare to the baseline
+    python benchmarks/bench_misc.py --save          # record a new baseline
+    python benchmarks/bench_misc.py --check         # exit non-zero on regressions
+"""
+
+import argparse
+import json
+import os
+import platform
+import stat
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from tabulate import tabulate
+
+from mypy_tools.misc import massif, math, slurm
+
+BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baselines", "misc.json"
+)
+
+_SACCT_COLUMNS = [
+    "JobID",
+    "JobName",
+    "Partition",
+    "AllocCPUS",
+    "Elapsed",
+    "TotalCPU",
+    "ReqMem",
+    "MaxRSS",
+    "State",
+]
+_SACCT_WIDTH = 12
+
+
+def write_massif(path: str, n_snapshots: int, seed: int = 0) -> None:
+    """Write a massif.out file with n_snapshots snapshots of random heap sizes."""
+    rng = np.random.default_rng(seed)
+    times = np.cumsum(rng.integers(1_000, 100_000, n_snapshots))
+    heap = rng.integers(0, 2**32, n_snapshots)
+    extra = rng.integers(0, 2**20, n_snapshots)
+    with open(path, "w") as f:
+        f.write("desc: (none)\ncmd: psi4 input.dat\ntime_unit: i\n")
+        for i in range(n_snapshots):
+            f.write(
+                f"#-----------\nsnapshot={i}\n#-----------\n"
+                f"time={times[i]}\nmem_heap_B={heap[i]}\nmem_heap_extra_B={extra[i]}\n"
+                "mem_stacks_B=0\nheap_tree=empty\n"
+            )
+
+
+def install_fake_sacct(bin_dir: str) -> None:
+    """Put a `sacct` on PATH that prints a job line and a batch line for any job id."""
+    fmt = " ".join([f"%-{_SACCT_WIDTH}s"] * len(_SACCT_COLUMNS)) + "\\n"
+    rows = [
+        _SACCT_COLUMNS,
+        ["-" * _SACCT_WIDTH] * len(_SACCT_COLUMNS),
+        [
+            "$2",
+            "input",
+            "batch",
+            "16",
+            "1-02:03:04",
+            "20:11:09",
+            "64G",
+            "",
+            "COMPLETED",
+        ],
+        [
+            "$2.batch",
+            "batch",
+            "",
+            "16",
+            "1-02:03:04",
+            "20:11:09",
+            "",
+            "51234567K",
+            "COMPLETED",
+        ],
+    ]
+
+    path = os.path.join(bin_dir, "sacct")
+    with open(path, "w") as f:
+        f.write("#!/bin/sh\n")
+        for row in rows:
+            f.write(f"printf '{fmt}' " + " ".join(f'"{v}"' for v in row) + "\n")
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ['PATH']}"
+
+
+def measure(func, *args) -> tuple[float, float]:
+    """Run func twice: once timed, once under tracemalloc.
+
+    Returns:
+        Wall time in seconds and peak traced memory in MB
+    """
+    t0 = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - t0
+
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak / 1024**2
+
+
+def bench_massif(tmp: str, sizes: list[int]) -> list[tuple]:
+    massif.pkl_dir = tmp
+    results = []
+    for n in sizes:
+        path = os.path.join(tmp, f"massif_{n}.out")
+        write_massif(path, n)
+        calls = iter(range(2))
+        elapsed, peak = measure(
+            lambda: massif.massif_to_pkl(path, "sys", f"bench_{n}_{next(calls)}")
+        )
+        results.append(("massif_to_pkl", n, "snapshots", elapsed, peak))
+    return results
+
+
+def bench_read_sacct(tmp: str, sizes: list[int]) -> list[tuple]:
+    install_fake_sacct(tmp)
+    results = []
+    for n in sizes:
+        runs = iter(range(2))
+
+        def run():
+            save_file = os.path.join(tmp, f"sacct_{n}_{next(runs)}.pkl")
+            for job_id in range(n):
+                slurm.read_sacct(job_id, save_file, method="hf")
+
+        elapsed, peak = measure(run)
+        results.append(("read_sacct", n, "jobs", elapsed, peak))
+    return results
+
+
+def bench_converters(sizes: list[int]) -> list[tuple]:
+    results = []
+    for n in sizes:
+        rng = np.random.default_rng(n)
+        days = rng.integers(0, 7, n)
+        secs = rng.integers(0, 86400, n)
+        times = [
+            (f"{d}-" if d else "")
+            + f"{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}"
+            for d, s in zip(days, secs)
+        ]
+        units = np.array(list("KMG"))[rng.integers(0, 3, n)]
+        mems = [f"{v}{u}" for v, u in zip(rng.integers(1, 10**6, n), units)]
+
+        elapsed, peak = measure(lambda: [math.convert_time(t, "h") for t in times])
+        results.append(("convert_time", n, "strings", elapsed, peak))
+        elapsed, peak = measure(lambda: [math.convert_memory(m, "G") for m in mems])
+        results.append(("convert_memory", n, "strings", elapsed, peak))
+    return results
+
+
+def bench_avg_radius(sizes: list[int], n_atoms: int) -> list[tuple]:
+    results = []
+    for n in sizes:
+        geoms = np.random.default_rng(n).normal(scale=5.0, size=(n, n_atoms, 3))
+        elapsed, peak = measure(lambda: [math.avg_radius(g) for g in geoms])
+        results.append(("avg_radius", n, "geometries", elapsed, peak))
+        elapsed, peak = measure(math.avg_radius_batch, geoms)
+        results.append(("avg_radius_batch", n, "geometries", elapsed, peak))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--massif-sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000, 1_000_000],
+    )
+    parser.add_argument("--sacct-sizes", type=int, nargs="+", default=[10, 100, 1_000])
+    parser.add_argument(
+        "--convert-sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument(
+        "--geom-sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--n-atoms", type=int, default=30)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument(
+        "--save", action="store_true", help="store the results as the baseline"
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="exit non-zero on regressions"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.5,
+        help="slowdown or peak memory ratio over the baseline counted as a regression",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = (
+            bench_massif(tmp, args.massif_sizes)
+            + bench_read_sacct(tmp, args.sacct_sizes)
+            + bench_converters(args.convert_sizes)
+            + bench_avg_radius(args.geom_sizes, args.n_atoms)
+        )
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    rows = []
+    current = {}
+    regressed = False
+    for case, n, unit, elapsed, peak in results:
+        key = f"{case}/{n}"
+        current[key] = {"seconds": elapsed, "peak_mb": peak}
+        base = baseline.get(key)
+        time_ratio = mem_ratio = None
+        if base is not None:
+            time_ratio = elapsed / base["seconds"]
+            mem_ratio = peak / base["peak_mb"] if base["peak_mb"] else None
+            regressed |= (
+                time_ratio > args.tolerance or (mem_ratio or 0) > args.tolerance
+            )
+        rows.append(
+            [
+                case,
+                n,
+                f"{elapsed:.3f}",
+                f"{n / elapsed:.0f} {unit}/s",
+                f"{peak:.1f}",
+                "-" if time_ratio is None else f"{time_ratio:.2f}x",
+                "-" if mem_ratio is None else f"{mem_ratio:.2f}x",
+            ]
+        )
+
+    print(
+        tabulate(
+            rows,
+            headers=[
+                "case",
+                "n",
+                "seconds",
+                "throughput",
+                "peak (MB)",
+                "time vs base",
+                "mem vs base",
+            ],
+        )
+    )
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        baseline.update(current)
+        with open(args.baseline, "w") as f:
+            json.dump(
+                {
+                    "machine": {
+                        "python": platform.python_version(),
+                        "platform": platform.platform(),
+                        "processor": platform.processor(),
+                        "cpus": os.cpu_count(),
+                        "numpy": np.__version__,
+                    },
+                    "results": dict(sorted(baseline.items())),
+                },
+                f,
+                indent=4,
+            )
+        print(f"Baseline written to {args.baseline}")
+
+    if args.check and regressed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
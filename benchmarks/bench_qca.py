@@ -0,0 +1,228 @@
+"""Benchmark the qca wrappers against an in-process fake server.
+
+Runs record_add, dataset_add, dataset_add_specification, dataset_submit, dataset_check
+and dataset_reset (soft and hard) of each wrapper at several dataset sizes, and reports
+wall time, throughput, round-trips and payload bytes of each operation.
+
+Usage:
+    python benchmarks/bench_qca.py --scales 1000 10000 100000 --latency 0.001
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+
+from fake_portal import FakePortalClient
+from qcelemental.models import Molecule
+from tabulate import tabulate
+from unittest import mock
+
+from mypy_tools.qca import (
+    ManybodyQCA,
+    OptimizationQCA,
+    SinglepointQCA,
+    SpecificationRegistry,
+    instrument,
+)
+
+WRAPPERS = {
+    "singlepoint": SinglepointQCA,
+    "optimization": OptimizationQCA,
+    "manybody": ManybodyQCA,
+}
+
+_WATER = dict(
+    symbols=["O", "H", "H"],
+    geometry=[0.0, 0.0, 0.0, 0.0, 1.43, 1.11, 0.0, -1.43, 1.11],
+)
+_WATER_DIMER = dict(
+    symbols=["O", "H", "H", "O", "H", "H"],
+    geometry=_WATER["geometry"] + [5.5, 0.0, 0.0, 5.5, 1.43, 1.11, 5.5, -1.43, 1.11],
+    fragments=[[0, 1, 2], [3, 4, 5]],
+)
+
+# distinct keyword sets for dataset_add_specification; each is added twice
+_N_SPECS = 10
+
+
+def make_molecules(kind: str, n: int) -> list[Molecule]:
+    base = Molecule(name="mol", **(_WATER_DIMER if kind == "manybody" else _WATER))
+    return [base.copy(update={"name": f"mol{i}"}) for i in range(n)]
+
+
+def make_wrapper(kind: str, client: FakePortalClient):
+    with mock.patch("mypy_tools.qca.base.PortalClient", lambda *args, **kwargs: client):
+        qca = WRAPPERS[kind]("fake", 0, "user", "password")
+    qca.registry = SpecificationRegistry()
+    return qca
+
+
+class Run:
+    """Times operations and the round-trips/bytes they cost on the fake client."""
+
+    def __init__(self, kind: str, scale: int, client: FakePortalClient):
+        self.kind = kind
+        self.scale = scale
+        self.client = client
+        self.rows = []
+
+    def __call__(self, op: str, n_items: int, func, *args, **kwargs):
+        trips, sent, received = (
+            self.client.round_trips,
+            self.client.bytes_sent,
+            self.client.bytes_received,
+        )
+        error = None
+        t0 = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = func(*args, **kwargs)
+        except Exception as e:
+            result, error = None, f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - t0
+
+        self.rows.append(
+            {
+                "wrapper": self.kind,
+                "scale": self.scale,
+                "operation": op,
+                "items": n_items,
+                "seconds": elapsed,
+                "items_per_s": n_items / elapsed if elapsed and error is None else None,
+                "round_trips": self.client.round_trips - trips,
+                "bytes_sent": self.client.bytes_sent - sent,
+                "bytes_received": self.client.bytes_received - received,
+                "error": error,
+            }
+        )
+        return result
+
+
+def bench(
+    kind: str, scale: int, latency: float, add_limit: int, fail_fraction: float
+) -> list:
+    mols = make_molecules(kind, scale)
+    client = FakePortalClient(latency=latency, add_limit=add_limit)
+    qca = make_wrapper(kind, client)
+    run = Run(kind, scale, client)
+
+    run("record_add", scale, qca.record_add, mols, "psi4", "hf", "sto-3g", "bench")
+
+    dataset = run("dataset_add", scale, qca.dataset_add, mols, f"bench-{kind}-{scale}")
+    if dataset is None:
+        return run.rows
+
+    specs = [{"maxiter": 100 + i} for i in range(_N_SPECS)] * 2
+    run(
+        "dataset_add_specification",
+        len(specs),
+        lambda: [
+            qca.dataset_add_specification(dataset, "psi4", "hf", "sto-3g", **kw)
+            for kw in specs
+        ],
+    )
+    n_records = scale * _N_SPECS
+
+    run("dataset_submit", n_records, qca.dataset_submit, dataset, "bench")
+    n_failed = client.fail_records(dataset, fail_fraction)
+
+    run("dataset_check", n_records, qca.dataset_check, dataset)
+    run("dataset_check(verbose)", n_records, qca.dataset_check, dataset, verbose=True)
+    run("dataset_reset", n_failed, qca.dataset_reset, dataset, "bench")
+
+    n_failed = client.fail_records(dataset, fail_fraction)
+    run(
+        "dataset_reset(hard)",
+        n_failed,
+        qca.dataset_reset,
+        dataset,
+        "bench",
+        hard_reset=True,
+    )
+
+    return run.rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument(
+        "--wrappers", nargs="+", choices=list(WRAPPERS), default=list(WRAPPERS)
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per round-trip"
+    )
+    parser.add_argument(
+        "--add-limit",
+        type=int,
+        default=None,
+        help="records accepted per add request, like the server's add_records limit",
+    )
+    parser.add_argument(
+        "--fail-fraction",
+        type=float,
+        default=0.1,
+        help="fraction of records errored before resets",
+    )
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument(
+        "--trace", help="also record instrumentation events to this JSON-lines file"
+    )
+    args = parser.parse_args()
+
+    if args.trace:
+        instrument.enable(instrument.JsonLinesSink(args.trace))
+
+    rows = []
+    for scale in args.scales:
+        for kind in args.wrappers:
+            rows.extend(
+                bench(kind, scale, args.latency, args.add_limit, args.fail_fraction)
+            )
+            print(f"done: {kind} x {scale}", flush=True)
+
+    print(
+        tabulate(
+            [
+                [
+                    r["wrapper"],
+                    r["scale"],
+                    r["operation"],
+                    r["items"],
+                    f"{r['seconds']:.3f}",
+                    "-" if r["items_per_s"] is None else f"{r['items_per_s']:.0f}",
+                    r["round_trips"],
+                    r["bytes_sent"],
+                    r["bytes_received"],
+                    r["error"] or "",
+                ]
+                for r in rows
+            ],
+            headers=[
+                "wrapper",
+                "scale",
+                "operation",
+                "items",
+                "seconds",
+                "items/s",
+                "round-trips",
+                "sent (B)",
+                "received (B)",
+                "error",
+            ],
+        )
+    )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {"latency": args.latency, "add_limit": args.add_limit, "results": rows},
+                f,
+                indent=4,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""In-process stand-in for a QCFractal server, for benchmarking the qca wrappers.
+
+Every call that would be an HTTP request to a real server goes through
+`FakePortalClient._send_request`, which sleeps for the configured latency and counts
+the round-trip and (estimated) payload bytes. Because it is the same hook a real
+PortalClient uses, `mypy_tools.qca.instrument` also sees these requests.
+"""
+
+import time
+
+from qcportal.record_models import RecordStatusEnum
+
+_RECORD_BYTES = 64  # rough size of one id/status row in a response
+
+
+class FakeRequest:
+    def __init__(self, method: str, url: str, data: bytes, response_size: int = 0):
+        self.method = method
+        self.url = url
+        self.data = data
+        self.response_size = response_size
+
+
+class FakeResponse:
+    def __init__(self, content: bytes):
+        self.content = content
+
+
+def _molecule_bytes(mols) -> int:
+    # serializing every molecule would dominate the benchmark, so size the first one
+    return len(mols[0].json()) * len(mols) if mols else 0
+
+
+class FakeDataset:
+    """Dataset held in memory, with the subset of the qcportal dataset API the wrappers use."""
+
+    def __init__(
+        self, client: "FakePortalClient", dataset_id: int, dataset_type: str, name: str
+    ):
+        self._client = client
+        self.id = dataset_id
+        self.dataset_type = dataset_type
+        self.name = name
+        self._base_url = f"api/v1/datasets/{dataset_type}/{dataset_id}"
+        self.entries = {}
+        self.specifications = {}
+        self.records = {}  # (entry, spec) -> record id
+        self.__spec_names_fetched = False
+
+    def __request(
+        self, method: str, action: str, sent: int = 0, received: int = 0
+    ) -> None:
+        self._client._request(method, f"{self._base_url}/{action}", sent, received)
+
+    @property
+    def entry_names(self) -> list[str]:
+        return list(self.entries)
+
+    @property
+    def specification_names(self) -> list[str]:
+        if not self.__spec_names_fetched:
+            self.__request(
+                "get",
+                "specification_names",
+                received=_RECORD_BYTES * len(self.specifications),
+            )
+            self.__spec_names_fetched = True
+        return list(self.specifications)
+
+    def add_entry(self, name: str, molecule, **kwargs) -> None:
+        self.__request("post", "entries/bulkCreate", sent=_molecule_bytes([molecule]))
+        self.entries[name] = molecule
+
+    def add_specification(self, name: str, specification, **kwargs) -> None:
+        self.__request("post", "specifications", sent=len(specification.json()))
+        self.specifications[name] = specification
+
+    def __selected(self, entry_names, specification_names):
+        entries = set(self.entries if entry_names is None else entry_names)
+        if specification_names is None:
+            specs = set(self.specifications)
+        elif isinstance(specification_names, str):
+            specs = {specification_names}
+        else:
+            specs = set(specification_names)
+        return [
+            (entry, spec, rec_id)
+            for (entry, spec), rec_id in self.records.items()
+            if entry in entries and spec in specs
+        ]
+
+    def submit(
+        self, entry_names=None, specification_names=None, tag=None, **kwargs
+    ) -> None:
+        entries = self.entries if entry_names is None else entry_names
+        specs = (
+            self.specifications if specification_names is None else specification_names
+        )
+        if isinstance(specs, str):
+            specs = [specs]
+        self.__request("post", "submit", sent=_RECORD_BYTES * len(entries))
+        for spec in specs:
+            for entry in entries:
+                key = (entry, spec)
+                if (
+                    key not in self.records
+                    or self.records[key] not in self._client.statuses
+                ):
+                    self.records[key] = self._client._new_records(1)[0]
+
+    def status(self) -> dict[str, dict[str, int]]:
+        counts = {}
+        for (_, spec), rec_id in self.records.items():
+            status = self._client.statuses.get(rec_id)
+            if status is not None:
+                spec_counts = counts.setdefault(spec, {})
+                spec_counts[status.value] = spec_counts.get(status.value, 0) + 1
+        self.__request(
+            "get", "status", received=_RECORD_BYTES * sum(map(len, counts.values()))
+        )
+        return counts
+
+    def detailed_status(self) -> list[tuple[str, str, RecordStatusEnum]]:
+        rows = [
+            (entry, spec, self._client.statuses[rec_id])
+            for (entry, spec), rec_id in self.records.items()
+            if rec_id in self._client.statuses
+        ]
+        self.__request("get", "detailed_status", received=_RECORD_BYTES * len(rows))
+        return rows
+
+    def set_tags(self, new_tags: list[str]) -> None:
+        self.__request("patch", "tags")
+
+    def reset_records(
+        self,
+        entry_names=None,
+        specification_names=None,
+        status_filter=RecordStatusEnum.error,
+        **kwargs,
+    ) -> None:
+        selected = self.__selected(entry_names, specification_names)
+        self.__request("post", "records/reset", sent=_RECORD_BYTES * len(selected))
+        for _, _, rec_id in selected:
+            if self._client.statuses.get(rec_id) == status_filter:
+                self._client.statuses[rec_id] = RecordStatusEnum.waiting
+
+    def cancel_records(
+        self, entry_names=None, specification_names=None, **kwargs
+    ) -> None:
+        selected = self.__selected(entry_names, specification_names)
+        self.__request("post", "records/cancel", sent=_RECORD_BYTES * len(selected))
+        for _, _, rec_id in selected:
+            self._client.statuses[rec_id] = RecordStatusEnum.cancelled
+
+
+class FakePortalClient:
+    """Stand-in for qcportal's PortalClient that keeps all state in memory.
+
+    Args:
+        latency (float): Seconds slept per round-trip.
+        add_limit (int): Most records accepted per add request, like a server's
+            `add_records` limit. Default no limit.
+        get_limit (int): Most entries per id-paging request.
+    """
+
+    address = "fake://benchmark"
+
+    def __init__(
+        self, latency: float = 0.0, add_limit: int = None, get_limit: int = 1000
+    ):
+        self.latency = latency
+        self.api_limits = {"get_records": get_limit, "add_records": add_limit}
+        self.round_trips = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.statuses = {}  # record id -> RecordStatusEnum
+        self.datasets = {}
+        self.__next_id = 1
+
+    def _send_request(
+        self, req: FakeRequest, allow_retries: bool = True
+    ) -> FakeResponse:
+        self.round_trips += 1
+        self.bytes_sent += len(req.data)
+        self.bytes_received += req.response_size
+        if self.latency:
+            time.sleep(self.latency)
+        return FakeResponse(b"\0" * req.response_size)
+
+    def _request(
+        self, method: str, endpoint: str, sent: int = 0, received: int = 0
+    ) -> None:
+        self._send_request(
+            FakeRequest(
+                method.upper(), f"{self.address}/{endpoint}", b"\0" * sent, received
+            )
+        )
+
+    def _new_records(self, n: int) -> list[int]:
+        ids = list(range(self.__next_id, self.__next_id + n))
+        self.__next_id += n
+        for rec_id in ids:
+            self.statuses[rec_id] = RecordStatusEnum.waiting
+        return ids
+
+    def __add_records(self, record_type: str, molecules) -> tuple[None, list[int]]:
+        if not isinstance(molecules, list):
+            molecules = [molecules]
+        limit = self.api_limits["add_records"]
+        if limit is not None and len(molecules) > limit:
+            raise RuntimeError(
+                f"Cannot add {len(molecules)} records - over the limit of {limit}"
+            )
+        self._request(
+            "post",
+            f"api/v1/records/{record_type}/bulkCreate",
+            _molecule_bytes(molecules),
+            _RECORD_BYTES * len(molecules),
+        )
+        return None, self._new_records(len(molecules))
+
+    def add_singlepoints(self, molecules, **kwargs) -> tuple[None, list[int]]:
+        return self.__add_records("singlepoint", molecules)
+
+    def add_optimizations(self, initial_molecules, **kwargs) -> tuple[None, list[int]]:
+        return self.__add_records("optimization", initial_molecules)
+
+    def add_manybodys(self, initial_molecules, **kwargs) -> tuple[None, list[int]]:
+        return self.__add_records("manybody", initial_molecules)
+
+    def add_dataset(self, dataset_type: str, name: str, **kwargs) -> FakeDataset:
+        self._request("post", f"api/v1/datasets/{dataset_type}")
+        dataset = FakeDataset(self, len(self.datasets) + 1, dataset_type, name)
+        self.datasets[dataset.id] = dataset
+        return dataset
+
+    def delete_records(
+        self, record_ids: list[int], soft_delete: bool = True, **kwargs
+    ) -> None:
+        self._request(
+            "post", "api/v1/records/bulkDelete", _RECORD_BYTES * len(record_ids)
+        )
+        for rec_id in record_ids:
+            self.statuses.pop(rec_id, None)
+
+    def make_request(
+        self, method: str, endpoint: str, response_type, body=None, **kwargs
+    ):
+        # only the id-paging endpoint of iterate_record_ids is needed
+        dataset = self.datasets[int(endpoint.split("/")[4])]
+        rows = []
+        for spec in body.specification_names:
+            for entry in body.entry_names:
+                rec_id = dataset.records.get((entry, spec))
+                if rec_id in self.statuses and (
+                    body.status is None or self.statuses[rec_id] in body.status
+                ):
+                    rows.append((entry, spec, rec_id))
+        self._request(
+            method,
+            endpoint,
+            _RECORD_BYTES * len(body.entry_names),
+            _RECORD_BYTES * len(rows),
+        )
+        return rows
+
+    def fail_records(self, dataset: FakeDataset, fraction: float = 0.1) -> int:
+        """Mark a fraction of a dataset's records as errored, without a round-trip.
+
+        Returns:
+            Number of records marked
+        """
+        step = max(int(round(1 / fraction)), 1)
+        failed = [
+            rec_id
+            for i, rec_id in enumerate(dataset.records.values())
+            if i % step == 0 and rec_id in self.statuses
+        ]
+        for rec_id in failed:
+            self.statuses[rec_id] = RecordStatusEnum.error
+        return len(failed)
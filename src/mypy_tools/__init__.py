@@ -1 +1,17 @@
-from . import psi, misc, qca
+import importlib
+
+# submodules are imported on first access, so e.g. `mypy_tools.misc.math` does not
+# pull in qcportal or matplotlib
+__all__ = ["psi", "misc", "qca"]
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
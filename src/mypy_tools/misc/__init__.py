@@ -1,12 +1,36 @@
-from .massif import massif_to_pkl, massif_visualize
-from .math import avg_radius, convert_memory, convert_time
-from .slurm import read_sacct
-
-__all__ = [
-    "massif_to_pkl",
-    "massif_visualize",
-    "avg_radius",
-    "convert_memory",
-    "convert_time",
-    "read_sacct",
-]
+import importlib
+
+# name -> submodule defining it, imported on first access
+_LAZY = {
+    "massif_to_pkl": ".massif",
+    "massif_visualize": ".massif",
+    "massif_plot_systems": ".massif",
+    "avg_radius": ".math",
+    "avg_radius_batch": ".math",
+    "convert_memory": ".math",
+    "convert_time": ".math",
+    "cluster_molecule": ".geometry",
+    "connected_components": ".geometry",
+    "enumerate_nmers": ".geometry",
+    "find_fragments": ".geometry",
+    "max_nmer_order": ".geometry",
+    "nmer_molecules": ".geometry",
+    "pairs_within": ".geometry",
+    "read_sacct": ".slurm",
+    "sacct_efficiency": ".slurm",
+    "efficiency_report": ".slurm",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,312 @@
+import itertools
+import numpy as np
+
+# the 13 neighbouring cells in one half-space, plus the cell itself
+_HALF_OFFSETS = np.array(
+    [(0, 0, 0)] + [o for o in itertools.product((-1, 0, 1), repeat=3) if o > (0, 0, 0)]
+)
+
+
+def pairs_within(coords: np.ndarray, cutoff: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Find all pairs of points closer than cutoff using a cell list, in roughly linear time
+
+    :param coords: array of shape (n, 3) containing the points
+    :param cutoff: distance cutoff, in the units of coords
+    :returns: index arrays i, j (with i < j) of the pairs within cutoff
+    :raises ValueError: if cutoff is not positive
+    """
+    if not cutoff > 0:
+        raise ValueError(f"cutoff must be positive, got {cutoff}")
+
+    coords = np.asarray(coords, dtype=float).reshape(-1, 3)
+    if len(coords) < 2:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    cells = np.floor((coords - coords.min(axis=0)) / cutoff).astype(np.int64)
+    dims = cells.max(axis=0) + 1
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+
+    order = np.argsort(keys, kind="stable")
+    uniq, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+    uniq_cells = cells[order[starts]]
+
+    i_all, j_all = [], []
+    for offset in _HALF_OFFSETS:
+        nbr = uniq_cells + offset
+        valid = np.all((nbr >= 0) & (nbr < dims), axis=1)
+        nbr_keys = (nbr[:, 0] * dims[1] + nbr[:, 1]) * dims[2] + nbr[:, 2]
+        pos = np.searchsorted(uniq, nbr_keys)
+        pos[~valid | (pos == len(uniq))] = 0
+        valid &= uniq[pos] == nbr_keys
+
+        a, b = np.nonzero(valid)[0], pos[valid]
+        n_a, n_b = counts[a], counts[b]
+        n_pairs = n_a * n_b
+        if not n_pairs.sum():
+            continue
+
+        # expand every (cell a, cell b) into all of its atom pairs
+        cell_pair = np.repeat(np.arange(len(a)), n_pairs)
+        local = np.arange(n_pairs.sum()) - np.repeat(
+            np.cumsum(n_pairs) - n_pairs, n_pairs
+        )
+        i = order[starts[a][cell_pair] + local // n_b[cell_pair]]
+        j = order[starts[b][cell_pair] + local % n_b[cell_pair]]
+
+        # filter each offset's candidates right away, as they far outnumber the real pairs
+        keep = np.sum(np.square(coords[i] - coords[j]), axis=1) <= cutoff**2
+        if not offset.any():
+            keep &= i < j
+        i, j = i[keep], j[keep]
+        i_all.append(i)
+        j_all.append(j)
+
+    if not i_all:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    i, j = np.concatenate(i_all), np.concatenate(j_all)
+    swap = i > j
+    i[swap], j[swap] = j[swap], i[swap]
+    return i, j
+
+
+def connected_components(n: int, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """
+    Label the connected components of a graph given as an edge list
+
+    :param n: number of nodes
+    :param i: first node of each edge
+    :param j: second node of each edge
+    :returns: array of shape (n,) with component labels 0, 1, ... in order of first node
+    """
+    labels = np.arange(n)
+    while True:
+        new = labels.copy()
+        np.minimum.at(new, i, labels[j])
+        np.minimum.at(new, j, labels[i])
+        new = new[new]  # pointer jumping
+        if np.array_equal(new, labels):
+            break
+        labels = new
+
+    _, labels = np.unique(labels, return_inverse=True)
+    return labels
+
+
+def find_fragments(
+    symbols: list[str], geometry: np.ndarray, scale: float = 1.2
+) -> list[np.ndarray]:
+    """
+    Split a geometry into covalently bonded fragments
+
+    Two atoms are bonded when closer than scale times the sum of their covalent radii
+
+    :param symbols: element symbol of each atom
+    :param geometry: array of shape (n_atoms, 3) in angstrom
+    :param scale: tolerance on the sum of covalent radii, default 1.2
+    :returns: list with the atom indices of each fragment
+    """
+    from qcelemental import covalentradii
+
+    geometry = np.asarray(geometry, dtype=float).reshape(-1, 3)
+    radii = {s: covalentradii.get(s, units="angstrom") for s in set(symbols)}
+    radius = np.array([radii[s] for s in symbols])
+
+    i, j = pairs_within(geometry, 2 * scale * radius.max())
+    dist = np.linalg.norm(geometry[i] - geometry[j], axis=1)
+    bonded = dist <= scale * (radius[i] + radius[j])
+    labels = connected_components(len(symbols), i[bonded], j[bonded])
+
+    order = np.argsort(labels, kind="stable")
+    return np.split(order, np.cumsum(np.bincount(labels))[:-1])
+
+
+def _fragment_neighbours(
+    geometry: np.ndarray, fragments: list[np.ndarray], cutoff: float
+) -> list[set[int]]:
+    # higher-index fragments with an atom within cutoff of each fragment
+    frag_of = np.empty(sum(len(f) for f in fragments), dtype=np.int64)
+    for k, frag in enumerate(fragments):
+        frag_of[frag] = k
+
+    i, j = pairs_within(geometry, cutoff)
+    fi, fj = frag_of[i], frag_of[j]
+    inter = fi != fj
+    fi, fj = np.minimum(fi[inter], fj[inter]), np.maximum(fi[inter], fj[inter])
+
+    neighbours = [set() for _ in fragments]
+    for a, b in set(zip(fi.tolist(), fj.tolist())):
+        neighbours[a].add(b)
+    return neighbours
+
+
+def _grow_nmers(
+    nmers: list[tuple[int, ...]], neighbours: list[set[int]]
+) -> list[tuple[int, ...]]:
+    # add one fragment to each n-mer, only through higher-index neighbours
+    return [
+        nmer + (k,)
+        for nmer in nmers
+        for k in sorted(neighbours[nmer[0]])
+        if k > nmer[-1] and all(k in neighbours[m] for m in nmer[1:])
+    ]
+
+
+def enumerate_nmers(
+    geometry: np.ndarray,
+    fragments: list[np.ndarray],
+    n: int,
+    cutoff: float,
+) -> list[tuple[int, ...]]:
+    """
+    Enumerate the n-mers whose fragments are all within cutoff of each other
+
+    Fragment distance is the shortest distance between their atoms
+
+    :param geometry: array of shape (n_atoms, 3) in angstrom
+    :param fragments: atom indices of each fragment
+    :param n: number of fragments in each n-mer
+    :param cutoff: distance cutoff in angstrom
+    :returns: sorted tuples of fragment indices
+    """
+    neighbours = _fragment_neighbours(geometry, fragments, cutoff)
+    nmers = [(k,) for k in range(len(fragments))]
+    for _ in range(n - 1):
+        nmers = _grow_nmers(nmers, neighbours)
+    return nmers
+
+
+def max_nmer_order(
+    geometry: np.ndarray,
+    fragments: list[np.ndarray],
+    max_n: int,
+    cutoff: float,
+) -> int:
+    """
+    Find the largest n, up to max_n, for which some n-mer is within cutoff (see enumerate_nmers)
+
+    :param geometry: array of shape (n_atoms, 3) in angstrom
+    :param fragments: atom indices of each fragment
+    :param max_n: largest n to look for
+    :param cutoff: distance cutoff in angstrom
+    :returns: largest n with at least one n-mer, 1 if there is none
+    """
+    if len(fragments) < 2:
+        return 1
+
+    neighbours = _fragment_neighbours(geometry, fragments, cutoff)
+    nmers = [(k,) for k in range(len(fragments))]
+    n = 1
+    while n < max_n:
+        nmers = _grow_nmers(nmers, neighbours)
+        if not nmers:
+            break
+        n += 1
+    return n
+
+
+def _molecule(symbols, geometry, fragments, name, **kwargs):
+    from qcelemental import constants, periodictable
+    from qcelemental.models import Molecule
+
+    kwargs = dict(kwargs)
+    atoms = np.concatenate(fragments)
+    sizes = np.cumsum([0] + [len(f) for f in fragments])
+
+    # explicit charges/multiplicities, otherwise qcelemental searches all fragment combinations
+    charges = kwargs.pop("fragment_charges", [0.0] * len(fragments))
+    if "fragment_multiplicities" in kwargs:
+        mults = kwargs.pop("fragment_multiplicities")
+    else:
+        z = np.array([periodictable.to_Z(s) for s in symbols])
+        mults = [
+            1 + (int(z[frag].sum() - charge) % 2)
+            for frag, charge in zip(fragments, charges)
+        ]
+    kwargs.setdefault("molecular_charge", sum(charges))
+    kwargs.setdefault("molecular_multiplicity", 1 + sum(m - 1 for m in mults))
+
+    return Molecule(
+        name=name,
+        symbols=[symbols[a] for a in atoms],
+        geometry=geometry[atoms] / constants.bohr2angstroms,
+        fragments=[list(range(sizes[k], sizes[k + 1])) for k in range(len(fragments))],
+        fragment_charges=charges,
+        fragment_multiplicities=mults,
+        **kwargs,
+    )
+
+
+def cluster_molecule(
+    symbols: list[str],
+    geometry: np.ndarray,
+    name: str = "cluster",
+    scale: float = 1.2,
+    **kwargs,
+):
+    """
+    Build a qcelemental Molecule of a whole cluster with its covalent fragments set
+
+    :param symbols: element symbol of each atom
+    :param geometry: array of shape (n_atoms, 3) in angstrom
+    :param name: name of the molecule, default "cluster"
+    :param scale: tolerance on the sum of covalent radii, default 1.2
+    :param kwargs: additional fields passed to Molecule
+    :returns: Molecule with fragments set
+    """
+    geometry = np.asarray(geometry, dtype=float).reshape(-1, 3)
+    fragments = find_fragments(symbols, geometry, scale)
+    return _molecule(symbols, geometry, fragments, name, **kwargs)
+
+
+def nmer_molecules(
+    symbols: list[str],
+    geometry: np.ndarray,
+    n: int,
+    cutoff: float,
+    name: str = "cluster",
+    scale: float = 1.2,
+    **kwargs,
+) -> list:
+    """
+    Build qcelemental Molecules of every n-mer of a cluster within a distance cutoff
+
+    :param symbols: element symbol of each atom
+    :param geometry: array of shape (n_atoms, 3) in angstrom
+    :param n: number of fragments in each n-mer
+    :param cutoff: distance cutoff in angstrom
+    :param name: prefix of the molecule names, followed by the fragment indices
+    :param scale: tolerance on the sum of covalent radii, default 1.2
+    :param kwargs: additional fields passed to Molecule; fragment_charges and
+        fragment_multiplicities are given per fragment of the whole cluster
+    :returns: list of Molecules with fragments set
+    """
+    geometry = np.asarray(geometry, dtype=float).reshape(-1, 3)
+    fragments = find_fragments(symbols, geometry, scale)
+
+    # cluster-wide fragment charges/multiplicities are split per n-mer, and the molecular
+    # charge/multiplicity of each n-mer follows from its fragments
+    kwargs = dict(kwargs)
+    charges = kwargs.pop("fragment_charges", None)
+    mults = kwargs.pop("fragment_multiplicities", None)
+    kwargs.pop("molecular_charge", None)
+    kwargs.pop("molecular_multiplicity", None)
+
+    molecules = []
+    for nmer in enumerate_nmers(geometry, fragments, n, cutoff):
+        nmer_kwargs = dict(kwargs)
+        if charges is not None:
+            nmer_kwargs["fragment_charges"] = [charges[k] for k in nmer]
+        if mults is not None:
+            nmer_kwargs["fragment_multiplicities"] = [mults[k] for k in nmer]
+        molecules.append(
+            _molecule(
+                symbols,
+                geometry,
+                [fragments[k] for k in nmer],
+                f"{name}_{'_'.join(map(str, nmer))}",
+                **nmer_kwargs,
+            )
+        )
+    return molecules
@@ -1,9 +1,8 @@
 import sys
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 
 scale_dic = {"B": 0, "KB": 1, "MB": 2, "GB": 3, "TB": 4}
+pkl_dir = "/theoryfs2/ds/jadeny/chem/dlpno_testing/pkl"
 
 
 def massif_visualize(dataset: str, system=None, scale="B") -> None:
@@ -14,8 +13,10 @@ def massif_visualize(dataset: str, system=None, scale="B") -> None:
     :param system: name of a system in dataset to plot by itself, default None
     :param scale: scale to use for memory in plot, default [B]ytes
     """
+    import pandas as pd
+    import matplotlib.pyplot as plt
 
-    path = f"/theoryfs2/ds/jadeny/chem/dlpno_testing/pkl/massif_{dataset}.pkl"
+    path = f"{pkl_dir}/massif_{dataset}.pkl"
     try:
         df = pd.read_pickle(path)
     except OSError as e:
@@ -60,6 +61,7 @@ def massif_visualize(dataset: str, system=None, scale="B") -> None:
         plt.savefig(f"{system}.png", bbox_inches="tight", dpi=1200)
     else:
         plt.savefig(f"{dataset}.png", bbox_inches="tight", dpi=1200)
+    plt.close()
 
 
 def massif_to_pkl(output: str, system: str, dataset: str) -> None:
@@ -70,6 +72,7 @@ def massif_to_pkl(output: str, system: str, dataset: str) -> None:
     :param system: the name of the system analyzed
     :param dataset: the dataset to add the massif output to
     """
+    import pandas as pd
 
     time = []
     mem_heap = []
@@ -89,9 +92,7 @@ def massif_to_pkl(output: str, system: str, dataset: str) -> None:
     )
 
     try:
-        df = pd.read_pickle(
-            f"/theoryfs2/ds/jadeny/chem/dlpno_testing/pkl/massif_{dataset}.pkl"
-        )
+        df = pd.read_pickle(f"{pkl_dir}/massif_{dataset}.pkl")
         # need to make equal length
         df[f"{system}_time"] = time
         df[f"{system}_heap"] = mem_heap
@@ -100,4 +101,169 @@ def massif_to_pkl(output: str, system: str, dataset: str) -> None:
         df = pd.DataFrame({f"{system}_time": time, f"{system}_heap": mem_heap})
 
     df.name = dataset
-    df.to_pickle(f"/theoryfs2/ds/jadeny/chem/dlpno_testing/pkl/massif_{dataset}.pkl")
+    df.to_pickle(f"{pkl_dir}/massif_{dataset}.pkl")
+
+
+def _new_figure(**kwargs):
+    # an Agg-backed Figure outside pyplot is freed with its last reference, not kept open
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(**kwargs)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _render_system(path: str, system: str, time, heap, scale: str, dpi: int) -> str:
+    fig = _new_figure()
+    try:
+        ax = fig.add_subplot()
+        ax.plot(time, heap, color="k")
+        ax.set_xlim(0, time.max() if len(time) else 1)
+        ax.set_ylim(0, heap.max() if len(heap) else 1)
+        ax.set_xlabel("Instructions executed")
+        ax.set_ylabel(f"Heap allocated ({scale})")
+        ax.set_title(system)
+        fig.savefig(path, bbox_inches="tight", dpi=dpi)
+    finally:
+        fig.clear()
+    return path
+
+
+def _render_overview(path: str, series: list, ncols: int, scale: str, dpi: int) -> str:
+    nrows = -(-len(series) // ncols)
+    fig = _new_figure(figsize=(3 * ncols, 2.5 * nrows))
+    try:
+        axes = fig.subplots(nrows, ncols, squeeze=False)
+        for ax, (system, time, heap) in zip(axes.flat, series):
+            ax.plot(time, heap, color="k", linewidth=0.8)
+            ax.set_title(system, fontsize=8)
+            ax.tick_params(labelsize=6)
+        for ax in axes.flat[len(series) :]:
+            ax.set_axis_off()
+        fig.supxlabel("Instructions executed")
+        fig.supylabel(f"Heap allocated ({scale})")
+        fig.savefig(path, bbox_inches="tight", dpi=dpi)
+    finally:
+        fig.clear()
+    return path
+
+
+def _digest(*parts) -> str:
+    import hashlib
+
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(
+            part.tobytes() if isinstance(part, np.ndarray) else repr(part).encode()
+        )
+    return h.hexdigest()
+
+
+def massif_plot_systems(
+    dataset: str,
+    systems: list = None,
+    out_dir: str = ".",
+    scale: str = "B",
+    overview: int = 16,
+    dpi: int = 300,
+    n_workers: int = None,
+    force: bool = False,
+) -> dict:
+    """
+    Render one plot per system of a massif dataset, plus overview grids, in parallel
+
+    Plots are drawn on Agg-backed figures in a process pool and freed after saving.
+    A manifest in out_dir records a digest of each plot's data, so plots whose data
+    has not changed since they were last rendered are skipped
+
+    :param dataset: name of the dataset to plot data from
+    :param systems: names of the systems to plot, default all systems in dataset
+    :param out_dir: directory to write the plots to, default current directory
+    :param scale: scale to use for memory in plot, default [B]ytes
+    :param overview: number of systems per overview grid, 0 for no overviews, default 16
+    :param dpi: resolution of the plots, default 300
+    :param n_workers: number of worker processes, default the number of CPUs
+    :param force: render every plot even if its data is unchanged, default False
+    :returns: dictionary of plot path to whether it was rendered (False if skipped)
+    """
+    import json
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    import pandas as pd
+
+    path = f"{pkl_dir}/massif_{dataset}.pkl"
+    try:
+        df = pd.read_pickle(path)
+    except OSError as e:
+        print(f"Unable to open {path}: {e}", file=sys.stderr)
+        return {}
+
+    if systems is None:
+        systems = [col[: -len("_time")] for col in df.filter(like="_time")]
+    scale_factor = 1024 ** scale_dic[scale.upper()]
+
+    series = []
+    for system in systems:
+        time = df[f"{system}_time"].to_numpy(dtype=float)
+        heap = df[f"{system}_heap"].to_numpy(dtype=float)
+        keep = ~(np.isnan(time) | np.isnan(heap))  # columns are padded to equal length
+        series.append((system, time[keep], heap[keep] / scale_factor))
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, f".massif_{dataset}.json")
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    jobs = {}
+    for system, time, heap in series:
+        out = os.path.join(out_dir, f"{system}.png")
+        jobs[out] = (
+            _digest(time, heap, scale, dpi),
+            _render_system,
+            (out, system, time, heap, scale, dpi),
+        )
+    if overview:
+        ncols = int(np.ceil(np.sqrt(overview)))
+        for page, start in enumerate(range(0, len(series), overview)):
+            chunk = series[start : start + overview]
+            out = os.path.join(out_dir, f"{dataset}_overview_{page}.png")
+            jobs[out] = (
+                _digest(*[part for s in chunk for part in s], ncols, scale, dpi),
+                _render_overview,
+                (out, chunk, ncols, scale, dpi),
+            )
+
+    todo = {
+        out: job
+        for out, job in jobs.items()
+        if force or manifest.get(out) != job[0] or not os.path.exists(out)
+    }
+
+    try:
+        if len(todo) > 1 and n_workers != 1:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                futures = {
+                    out: pool.submit(func, *args)
+                    for out, (_, func, args) in todo.items()
+                }
+                # wait for every plot so the ones that rendered are recorded if another fails
+                errors = [future.exception() for future in futures.values()]
+                for out, error in zip(futures, errors):
+                    if error is None:
+                        manifest[out] = todo[out][0]
+                error = next((e for e in errors if e is not None), None)
+                if error is not None:
+                    raise error
+        else:
+            for out, (digest, func, args) in todo.items():
+                func(*args)
+                manifest[out] = digest
+    finally:
+        # keep the plots that did render from being redrawn next time
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=4)
+
+    return {out: out in todo for out in jobs}
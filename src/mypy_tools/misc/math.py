@@ -9,9 +9,9 @@ def avg_radius(geom: np.ndarray) -> float:
     :returns: average radius as a float
     """
     assert geom.ndim == 2, "geom dimension must be 2"
-    assert len(geom) > 0 and len(geom[0]) == 3, (
-        "geometry input must have 3 (x, y, z) coordinates for at least one atom"
-    )
+    assert (
+        len(geom) > 0 and len(geom[0]) == 3
+    ), "geometry input must have 3 (x, y, z) coordinates for at least one atom"
 
     num_atoms = len(geom)
     x_cm, y_cm, z_cm = 0, 0, 0
@@ -23,6 +23,22 @@ def avg_radius(geom: np.ndarray) -> float:
     return np.sqrt(np.sum(np.square(geom - [x_cm, y_cm, z_cm]) / num_atoms))
 
 
+def avg_radius_batch(geoms: np.ndarray) -> np.ndarray:
+    """
+    Compute the 'average radius' (see avg_radius) of many geometries with the same number of atoms at once
+
+    :param geoms: array of shape (n_geoms, n_atoms, 3) containing system coordinates
+    :returns: array of shape (n_geoms,) with the average radius of each geometry
+    """
+    assert (
+        geoms.ndim == 3 and geoms.shape[2] == 3
+    ), "geoms must have shape (n_geoms, n_atoms, 3)"
+    assert geoms.shape[1] > 0, "geometries must contain at least one atom"
+
+    centered = geoms - geoms.mean(axis=1, keepdims=True)
+    return np.sqrt(np.sum(np.square(centered), axis=(1, 2)) / geoms.shape[1])
+
+
 def convert_time(
     time_str: str,
     unit: str,
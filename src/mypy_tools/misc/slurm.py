@@ -61,5 +61,149 @@ def read_sacct(
     df.to_pickle(save_file)
 
 
+def _duration_seconds(col):
+    """Vectorized parse of sacct [D-][HH:]MM:SS[.sss] durations into seconds"""
+    parts = (
+        col.astype(str)
+        .str.extract(
+            r"^(?:(?P<d>\d+)-)?(?:(?P<h>\d+):)?(?P<m>\d+):(?P<s>\d+(?:\.\d+)?)$"
+        )
+        .astype(float)
+    )
+    # "D-HH:MM" (no seconds) is not produced by sacct, so a missing hour field means MM:SS
+    return (
+        parts["d"].fillna(0) * 86400
+        + parts["h"].fillna(0) * 3600
+        + parts["m"] * 60
+        + parts["s"]
+    )
+
+
+def _memory_bytes(col, ncpus=None, nnodes=None):
+    """Vectorized parse of sacct memory strings (e.g. 1024K, 4G, 4000Mc, 16Gn) into bytes"""
+    scale = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+    parts = col.astype(str).str.extract(r"^(?P<v>[\d.]+)(?P<u>[KMGT]?)(?P<per>[nc]?)$")
+    mem = parts["v"].astype(float) * parts["u"].map(scale)
+
+    # old-style ReqMem is per cpu (c) or per node (n)
+    if ncpus is not None:
+        mem = mem.where(parts["per"] != "c", mem * ncpus)
+    if nnodes is not None:
+        mem = mem.where(parts["per"] != "n", mem * nnodes)
+    return mem
+
+
+def sacct_efficiency(sacct="sacct.pkl"):
+    """
+    Compute per-job resource efficiency from data collected with read_sacct
+
+    Adds the columns cpu_efficiency (TotalCPU / (Elapsed * NCPUS)), mem_efficiency
+    (MaxRSS / ReqMem), queue_wait_h (Start - Submit), core_hours (Elapsed * NCPUS),
+    cpu_hours (TotalCPU), max_rss_gb, req_mem_gb and wasted_core_hours
+    (core_hours * (1 - cpu_efficiency)). Columns missing from the sacct data give NaN.
+
+    :param sacct: DataFrame or path to the pickle file written by read_sacct, default sacct.pkl
+    :returns: DataFrame with one row per job
+    """
+    import numpy as np
+    import pandas as pd
+
+    df = pd.read_pickle(sacct) if isinstance(sacct, str) else sacct.copy()
+    nan = pd.Series(np.nan, index=df.index)
+
+    def column(*names):
+        for name in names:
+            if name in df:
+                return df[name]
+        return nan
+
+    ncpus = pd.to_numeric(column("NCPUS", "AllocCPUS"), errors="coerce")
+    nnodes = pd.to_numeric(column("NNodes", "AllocNodes"), errors="coerce")
+    elapsed = _duration_seconds(column("Elapsed"))
+    total_cpu = _duration_seconds(column("TotalCPU"))
+    max_rss = _memory_bytes(column("MaxRSS"))
+    req_mem = _memory_bytes(column("ReqMem"), ncpus, nnodes)
+
+    df["core_hours"] = elapsed * ncpus / 3600
+    df["cpu_hours"] = total_cpu / 3600
+    df["max_rss_gb"] = max_rss / 1024**3
+    df["req_mem_gb"] = req_mem / 1024**3
+    df["cpu_efficiency"] = total_cpu / (elapsed * ncpus)
+    df["mem_efficiency"] = max_rss / req_mem
+    df["queue_wait_h"] = (
+        pd.to_datetime(column("Start"), errors="coerce")
+        - pd.to_datetime(column("Submit"), errors="coerce")
+    ).dt.total_seconds() / 3600
+    df["wasted_core_hours"] = df["core_hours"] * (
+        1 - df["cpu_efficiency"].clip(upper=1)
+    )
+
+    return df
+
+
+def efficiency_report(sacct="sacct.pkl", group_by=None, n_flag=5):
+    """
+    Summarize job efficiency by job parameters and flag the most wasteful groups
+
+    The efficiencies of a group are ratios of sums over its jobs (e.g. total CPU time over
+    total core time), so long and large jobs weigh more than short ones.
+
+    :param sacct: DataFrame or path to the pickle file written by read_sacct, default sacct.pkl
+    :param group_by: columns to group by, default the parameters passed to read_sacct as
+        **kwargs (the columns that are not sacct fields, which start with an uppercase letter)
+    :param n_flag: number of groups with the most wasted core-hours to flag, default 5
+    :returns: DataFrame with one row per group, sorted by wasted core-hours
+    """
+    df = sacct_efficiency(sacct)
+
+    added = {
+        "core_hours",
+        "cpu_hours",
+        "max_rss_gb",
+        "req_mem_gb",
+        "cpu_efficiency",
+        "mem_efficiency",
+        "queue_wait_h",
+        "wasted_core_hours",
+    }
+    if group_by is None:
+        group_by = [c for c in df.columns if c not in added and not c[:1].isupper()]
+    if isinstance(group_by, str):
+        group_by = [group_by]
+
+    # only jobs with both parts of a ratio count towards it
+    cpu_valid = df["cpu_efficiency"].notna()
+    mem_valid = df["mem_efficiency"].notna()
+    df["_cpu_used"] = df["cpu_hours"].where(cpu_valid)
+    df["_cpu_avail"] = df["core_hours"].where(cpu_valid)
+    df["_mem_used"] = df["max_rss_gb"].where(mem_valid)
+    df["_mem_avail"] = df["req_mem_gb"].where(mem_valid)
+
+    if group_by:
+        grouped = df.groupby(group_by, dropna=False)
+    else:
+        grouped = df.groupby(lambda _: "all")
+
+    report = grouped.agg(
+        jobs=("core_hours", "size"),
+        core_hours=("core_hours", "sum"),
+        wasted_core_hours=("wasted_core_hours", "sum"),
+        cpu_used=("_cpu_used", "sum"),
+        cpu_avail=("_cpu_avail", "sum"),
+        mem_used=("_mem_used", "sum"),
+        mem_avail=("_mem_avail", "sum"),
+        queue_wait_h=("queue_wait_h", "mean"),
+    )
+    report.insert(3, "cpu_efficiency", report.pop("cpu_used") / report.pop("cpu_avail"))
+    report.insert(4, "mem_efficiency", report.pop("mem_used") / report.pop("mem_avail"))
+    report = report.sort_values("wasted_core_hours", ascending=False)
+
+    report["flagged"] = False
+    report.iloc[:n_flag, report.columns.get_loc("flagged")] = True
+    report.loc[report["wasted_core_hours"].fillna(0) <= 0, "flagged"] = False
+
+    return report
+
+
 if __name__ == "__main__":
     pass
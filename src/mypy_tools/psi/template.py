@@ -1,6 +1,119 @@
 import shutil
 import os
 
+# Python inserted around the psi4 energy() call; times SCF (every method goes
+# through scf_helper) and everything after it, and writes psi_timings.json. The
+# timings are written at exit too, so a run that raises or is sent SIGTERM keeps them
+PSI_INSTRUMENT_BEGIN = """import atexit
+import resource
+import signal
+import sys
+import time
+
+_timings = {"stages": {}, "completed": False}
+_t0, _c0 = time.perf_counter(), time.process_time()
+
+
+def _write_timings():
+    if "total" in _timings:
+        return
+    _wall, _cpu = time.perf_counter() - _t0, time.process_time() - _c0
+    _scf = _timings["stages"].get("scf", {"wall": 0.0, "cpu": 0.0})
+    _timings["stages"]["post_scf"] = {"wall": _wall - _scf["wall"], "cpu": _cpu - _scf["cpu"]}
+    _timings["total"] = {"wall": _wall, "cpu": _cpu}
+    _timings["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open("psi_timings.json", "w") as f:
+        json.dump(_timings, f, indent=4)
+
+
+atexit.register(_write_timings)
+# SIGTERM (e.g. Slurm's time limit) exits through atexit instead of killing outright
+signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+
+try:
+    from psi4.driver.procrouting import proc as _proc
+
+    _scf_helper = _proc.scf_helper
+
+    def _timed_scf_helper(*args, **kwargs):
+        t, c = time.perf_counter(), time.process_time()
+        try:
+            return _scf_helper(*args, **kwargs)
+        finally:
+            stage = _timings["stages"].setdefault("scf", {"wall": 0.0, "cpu": 0.0, "calls": 0})
+            stage["wall"] += time.perf_counter() - t
+            stage["cpu"] += time.process_time() - c
+            stage["calls"] += 1
+
+    _proc.scf_helper = _timed_scf_helper
+except (ImportError, AttributeError):
+    pass
+"""
+
+PSI_INSTRUMENT_END = """_timings["completed"] = True
+_write_timings()
+"""
+
+# Bash inserted around the psi4 run; captures /usr/bin/time -v, samples the RSS of
+# the job's process tree and combines everything into profile.json. The job exits
+# with psi4's status, and a SIGTERM (e.g. the time limit) still writes the profile
+SBATCH_INSTRUMENT_BEGIN = """JOB_START=$(date +%s.%N)
+rm -f time.out rss.tsv psi_timings.json
+TIME_CMD=""
+if [ -x /usr/bin/time ]; then
+  TIME_CMD="/usr/bin/time -v -o time.out"
+fi
+(
+  while true; do
+    echo "$(date +%s) $(ps -eo pid=,ppid=,rss= | awk -v root=$$ '{p[$1]=$2; r[$1]=$3} END {s=0; for (i in p) {j=i; while ((j in p) && j!=root && j>1) j=p[j]; if (j==root) s+=r[i]} print s}')" >> rss.tsv
+    sleep {interval}
+  done
+) &
+RSS_SAMPLER=$!
+
+write_profile() {
+  kill $RSS_SAMPLER 2>/dev/null
+  JOB_END=$(date +%s.%N)
+  python - "$JOB_START" "$JOB_END" "$1" "$2" <<'PROFILE_EOF'
+import json, os, sys
+
+profile = {
+    "job_id": os.environ.get("SLURM_JOB_ID"),
+    "job_name": os.environ.get("SLURM_JOB_NAME"),
+    "start": float(sys.argv[1]),
+    "end": float(sys.argv[2]),
+    "wall": float(sys.argv[2]) - float(sys.argv[1]),
+    "exit_status": int(sys.argv[3]),
+    "signal": sys.argv[4] or None,
+    "time": {},
+    "rss_kb": [],
+}
+if os.path.exists("time.out"):
+    with open("time.out") as f:
+        for line in f:
+            key, sep, value = line.strip().rpartition(": ")
+            if sep:
+                profile["time"][key] = value
+if os.path.exists("rss.tsv"):
+    with open("rss.tsv") as f:
+        profile["rss_kb"] = [[int(x) for x in line.split()] for line in f if len(line.split()) == 2]
+if os.path.exists("psi_timings.json"):
+    with open("psi_timings.json") as f:
+        profile["psi4"] = json.load(f)
+
+with open("profile.json", "w") as f:
+    json.dump(profile, f, indent=4)
+PROFILE_EOF
+}
+trap 'write_profile 143 TERM; exit 143' TERM"""
+
+SBATCH_INSTRUMENT_PREFIX = "$TIME_CMD"
+
+SBATCH_INSTRUMENT_END = """RUN_STATUS=$?
+trap - TERM
+write_profile $RUN_STATUS ""
+exit $RUN_STATUS"""
+
 
 def __replace_options(data, options):
     for k, v in options.items():
@@ -22,7 +135,12 @@ def __replace_options(data, options):
 def copy_psi_template(
     json_input: dict,
     template_path: str = "~/data/gits/mypy_tools/templates/psi.template",
+    instrument: bool = False,
 ) -> None:
+    # Per-stage psi4 timings go to psi_timings.json when instrumented
+    json_input["__instrument_begin"] = PSI_INSTRUMENT_BEGIN if instrument else ""
+    json_input["__instrument_end"] = PSI_INSTRUMENT_END if instrument else ""
+
     # Copy template input file to current directory
     shutil.copy(os.path.expanduser(template_path), f"./{json_input['__name']}.py")
 
@@ -39,7 +157,18 @@ def copy_psi_template(
 def copy_sbatch_template(
     json_input: dict,
     template_path: str = "~/data/gits/mypy_tools/templates/sbatch.template",
+    instrument: bool = False,
+    rss_interval: int = 30,
 ) -> None:
+    # Resource usage and RSS samples go to profile.json when instrumented
+    json_input["__instrument_begin"] = (
+        SBATCH_INSTRUMENT_BEGIN.replace("{interval}", str(rss_interval))
+        if instrument
+        else ""
+    )
+    json_input["__instrument_prefix"] = SBATCH_INSTRUMENT_PREFIX if instrument else ""
+    json_input["__instrument_end"] = SBATCH_INSTRUMENT_END if instrument else ""
+
     # Copy template input file to current directory
     shutil.copy(os.path.expanduser(template_path), f"./{json_input['__name']}.sbatch")
 
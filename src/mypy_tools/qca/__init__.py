@@ -1,6 +1,45 @@
-from .base import BaseQCA
-from .singlepoint import SinglepointQCA
-from .optimization import OptimizationQCA
-from .manybody import ManybodyQCA
+import importlib
 
-__all__ = ["BaseQCA", "SinglepointQCA", "OptimizationQCA", "ManybodyQCA"]
+# name -> submodule defining it, imported on first access so that importing the
+# package does not load qcportal until a wrapper is used
+_LAZY = {
+    "BaseQCA": ".base",
+    "SinglepointQCA": ".singlepoint",
+    "OptimizationQCA": ".optimization",
+    "ManybodyQCA": ".manybody",
+    "SpecificationRegistry": ".specification",
+    "canonicalize_keywords": ".specification",
+    "hash_keywords": ".specification",
+    "StatusReport": ".status",
+    "iterate_record_ids": ".status",
+    "RecordCache": ".cache",
+    "Column": ".export",
+    "export_dataset": ".export",
+    "TrajectorySet": ".trajectory",
+    "load_trajectories": ".trajectory",
+    "Backoff": ".wait",
+    "instrument": ".instrument",
+    "HistogramSink": ".instrument",
+    "JsonLinesSink": ".instrument",
+    "AsyncQCA": ".aio",
+    "AsyncSinglepointQCA": ".aio",
+    "AsyncOptimizationQCA": ".aio",
+    "AsyncManybodyQCA": ".aio",
+    "gather": ".aio",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        module = importlib.import_module(_LAZY[name], __name__)
+        # entries naming their own submodule export the module itself
+        value = module if _LAZY[name] == f".{name}" else getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,293 @@
+import asyncio
+import functools
+import threading
+import time
+
+from concurrent.futures import Executor, ThreadPoolExecutor
+from qcportal.dataset_models import BaseDataset
+from qcportal.record_models import BaseRecord
+from typing import Any, AsyncIterator, Awaitable, Optional
+from .base import BaseQCA
+from .singlepoint import SinglepointQCA
+from .optimization import OptimizationQCA
+from .manybody import ManybodyQCA
+from .wait import Backoff, Poller, Sleep
+
+_executor = None
+_max_workers = 8
+
+
+def set_max_workers(max_workers: int) -> None:
+    """Set the size of the executor shared by all async wrappers.
+
+    This is the global limit on concurrent server operations. It only takes effect
+    before the shared executor is first used.
+
+    Args:
+        max_workers (int): Maximum number of concurrent blocking calls.
+
+    Returns:
+        None
+    """
+    global _max_workers
+    if _executor is not None:
+        raise RuntimeError("Shared executor is already running")
+    _max_workers = max_workers
+
+
+def get_executor() -> Executor:
+    """Return the bounded executor shared by all async wrappers, creating it once."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=_max_workers, thread_name_prefix="mypy_tools_qca"
+        )
+    return _executor
+
+
+async def gather(*aws: Awaitable, limit: Optional[int] = None) -> list[Any]:
+    """Like asyncio.gather, but with at most `limit` awaitables running at once.
+
+    Args:
+        *aws (Awaitable): Coroutines or futures to run.
+        limit (int): Maximum number running concurrently, default no limit.
+
+    Returns:
+        List of results in the order of `aws`
+    """
+    if limit is None:
+        return await asyncio.gather(*aws)
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(run(aw) for aw in aws))
+
+
+def _blocking(name: str, collect: bool = False):
+    # collect: the sync method returns an iterator, which is consumed on the executor
+    def method(self, *args, **kwargs):
+        func = getattr(self.sync, name)
+        if collect:
+            return self._run(lambda: list(func(*args, **kwargs)))
+        return self._run(func, *args, **kwargs)
+
+    method.__name__ = name
+    method.__doc__ = f"Async version of {name}, run on the shared executor."
+    if collect:
+        method.__doc__ += " Returns a list instead of an iterator."
+    return method
+
+
+class _LinkedEvent(threading.Event):
+    """Event that also reads as set while its parent is, without setting the parent itself."""
+
+    def __init__(self, parent: Optional[threading.Event] = None):
+        super().__init__()
+        self.__parent = parent
+
+    def is_set(self) -> bool:
+        return super().is_set() or (
+            self.__parent is not None and self.__parent.is_set()
+        )
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        if self.__parent is None:
+            return super().wait(timeout)
+        # the parent cannot wake this event up, so it is checked at least every second
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.is_set():
+            remaining = 1.0 if deadline is None else deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            super().wait(min(remaining, 1.0))
+        return True
+
+
+class AsyncQCA:
+    """Asyncio facade around a BaseQCA, running its blocking calls on a bounded executor.
+
+    The constructor connects to the server in the calling thread; from a running event
+    loop use `await AsyncQCA.connect(...)` instead.
+    """
+
+    _sync_class = BaseQCA
+
+    def __init__(
+        self,
+        address: str,
+        port: int,
+        username: str,
+        password: str,
+        executor: Optional[Executor] = None,
+    ):
+        self.__sync = self._sync_class(address, port, username, password)
+        self.__executor = executor
+
+    @classmethod
+    async def connect(
+        cls,
+        address: str,
+        port: int,
+        username: str,
+        password: str,
+        executor: Optional[Executor] = None,
+    ) -> "AsyncQCA":
+        """Connect to the server on the executor instead of blocking the event loop.
+
+        Args:
+            address (str): Server address.
+            port (int): Server port.
+            username (str): Username.
+            password (str): Password.
+            executor (Executor): Executor to use, default the shared executor.
+
+        Returns:
+            Connected async wrapper
+        """
+        loop = asyncio.get_running_loop()
+        qca = await loop.run_in_executor(
+            executor if executor is not None else get_executor(),
+            cls._sync_class,
+            address,
+            port,
+            username,
+            password,
+        )
+        return cls.from_sync(qca, executor)
+
+    @classmethod
+    def from_sync(cls, qca: BaseQCA, executor: Optional[Executor] = None) -> "AsyncQCA":
+        """Wrap an existing (connected) BaseQCA.
+
+        Args:
+            qca (BaseQCA): Wrapper to run asynchronously.
+            executor (Executor): Executor to use, default the shared executor.
+
+        Returns:
+            Async wrapper around `qca`
+        """
+        obj = cls.__new__(cls)
+        obj.__sync = qca
+        obj.__executor = executor
+        return obj
+
+    @property
+    def sync(self) -> BaseQCA:
+        return self.__sync
+
+    @property
+    def executor(self) -> Executor:
+        if self.__executor is None:
+            return get_executor()
+        return self.__executor
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def _poll(
+        self, steps, *args, timeout=None, stop=None, backoff=None, **kwargs
+    ):
+        # only the polls run on the executor; the sleeps between them run on the event loop,
+        # so waiters do not hold executor workers. The caller's stop event may be shared
+        # with other waiters, so this one only ever sets its own linked event
+        own_stop = _LinkedEvent(stop)
+        poller = Poller(timeout, own_stop, backoff)
+        gen = steps(*args, poller=poller, **kwargs)
+        done = object()
+        future = None
+        try:
+            while True:
+                future = self.executor.submit(next, gen, done)
+                item = await asyncio.wrap_future(future)
+                if item is done:
+                    return
+                if isinstance(item, Sleep):
+                    if not await poller.async_sleep(item.n_pending):
+                        return
+                else:
+                    yield item
+        finally:
+            own_stop.set()
+            if future is not None and not future.done():
+                # cancelled mid-poll: the generator can only be closed once the poll returns
+                future.add_done_callback(lambda _: gen.close())
+            else:
+                gen.close()
+
+    def wait(
+        self,
+        record_ids: int | list[int],
+        include: Optional[list[str]] = None,
+        timeout: Optional[float] = None,
+        stop: Optional[threading.Event] = None,
+        backoff: Optional[Backoff] = None,
+        page_size: int = 1000,
+    ) -> AsyncIterator[BaseRecord]:
+        """Async version of wait; polls run on the shared executor, sleeps on the event loop."""
+        return self._poll(
+            self.sync._wait_steps,
+            record_ids,
+            include,
+            page_size=page_size,
+            timeout=timeout,
+            stop=stop,
+            backoff=backoff,
+        )
+
+    def dataset_wait(
+        self,
+        dataset: BaseDataset,
+        specs: Optional[str | list[str]] = None,
+        include: Optional[list[str]] = None,
+        timeout: Optional[float] = None,
+        stop: Optional[threading.Event] = None,
+        backoff: Optional[Backoff] = None,
+        page_size: int = 1000,
+    ) -> AsyncIterator[tuple[str, str, BaseRecord]]:
+        """Async version of dataset_wait; polls run on the shared executor, sleeps on the loop."""
+        return self._poll(
+            self.sync._dataset_wait_steps,
+            dataset,
+            specs,
+            include,
+            page_size=page_size,
+            timeout=timeout,
+            stop=stop,
+            backoff=backoff,
+        )
+
+    record_add = _blocking("record_add")
+    dataset_add = _blocking("dataset_add")
+    dataset_add_specification = _blocking("dataset_add_specification")
+    dataset_submit = _blocking("dataset_submit")
+    dataset_reset = _blocking("dataset_reset")
+    dataset_cancel = _blocking("dataset_cancel")
+    dataset_check = _blocking("dataset_check")
+    dataset_status = _blocking("dataset_status")
+    dataset_status_ids = _blocking("dataset_status_ids", collect=True)
+    dataset_status_ids_by_status = _blocking(
+        "dataset_status_ids_by_status", collect=True
+    )
+    dataset_sync = _blocking("dataset_sync")
+    dataset_export = _blocking("dataset_export")
+
+
+class AsyncSinglepointQCA(AsyncQCA):
+    _sync_class = SinglepointQCA
+
+
+class AsyncOptimizationQCA(AsyncQCA):
+    _sync_class = OptimizationQCA
+
+    load_trajectories = _blocking("load_trajectories")
+
+
+class AsyncManybodyQCA(AsyncQCA):
+    _sync_class = ManybodyQCA
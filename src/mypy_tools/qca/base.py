@@ -1,11 +1,34 @@
+import threading
+
 from abc import ABC, abstractmethod
 from qcelemental.models.molecule import Molecule
 from qcportal import PortalClient
 from qcportal.dataset_models import BaseDataset
-from typing import Optional
+from qcportal.record_models import BaseRecord, RecordStatusEnum
+from typing import Iterator, Optional
+from .cache import RecordCache
+from .export import Column, export_dataset
+from .instrument import instrument_class, instrument_client
+from .specification import SpecificationRegistry, registry
+from .status import (
+    StatusReport,
+    dataset_status,
+    fetch_record_ids,
+    iterate_record_ids,
+    iterate_record_ids_by_status,
+)
+from .wait import FINISHED_STATUSES, Backoff, Poller, Sleep, poll
 
 
 class BaseQCA(ABC):
+    # default properties exported by dataset_export
+    export_properties: tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # wrapped methods only record events after instrument.enable()
+        instrument_class(cls)
+
     def __init__(self, address: str, port: int, username: str, password: str):
         try:
             self.__client = PortalClient(
@@ -13,8 +36,10 @@ class BaseQCA(ABC):
             )
         except Exception as e:
             raise ConnectionError(f"Couldn't connect to QCArchive server: {e}")
+        instrument_client(self.__client)
 
         self.__computation_type = None
+        self.__registry = registry
 
     @property
     def client(self) -> PortalClient:
@@ -22,8 +47,17 @@ class BaseQCA(ABC):
 
     @client.setter
     def client(self, client: PortalClient) -> None:
+        instrument_client(client)
         self.__client = client
 
+    @property
+    def registry(self) -> SpecificationRegistry:
+        return self.__registry
+
+    @registry.setter
+    def registry(self, registry: SpecificationRegistry) -> None:
+        self.__registry = registry
+
     @property
     def computation_type(self) -> str:
         if self.__computation_type is None:
@@ -34,6 +68,304 @@ class BaseQCA(ABC):
     def computation_type(self, value: str) -> None:
         self.__computation_type = value
 
+    def dataset_status(
+        self, dataset: BaseDataset, specs: Optional[str | list[str]] = None
+    ) -> StatusReport:
+        """Get record counts by (specification, status), computed on the server.
+
+        Args:
+            dataset (BaseDataset): Dataset to check.
+            specs (str | list(str)): Specification(s) to report.
+
+        Returns:
+            StatusReport of the dataset
+        """
+        return dataset_status(dataset, specs)
+
+    def dataset_status_ids(
+        self,
+        dataset: BaseDataset,
+        status: str | list[str],
+        specs: Optional[str | list[str]] = None,
+        page_size: Optional[int] = None,
+    ) -> Iterator[tuple[str, str, int]]:
+        """Stream the ids of the records of a dataset in the given status(es).
+
+        Args:
+            dataset (BaseDataset): Dataset to query.
+            status (str | list(str)): Status(es) to drill down into.
+            specs (str | list(str)): Specification(s) to query.
+            page_size (int): Number of entries per request.
+
+        Returns:
+            Iterator of (entry name, specification name, record id)
+        """
+        return iterate_record_ids(self.client, dataset, status, specs, page_size)
+
+    def dataset_status_ids_by_status(
+        self,
+        dataset: BaseDataset,
+        specs: Optional[str | list[str]] = None,
+        page_size: Optional[int] = None,
+    ) -> Iterator[tuple[RecordStatusEnum, str, str, int]]:
+        """Stream the ids of all records of a dataset, grouped by status.
+
+        The detailed status is fetched once for all statuses.
+
+        Args:
+            dataset (BaseDataset): Dataset to query.
+            specs (str | list(str)): Specification(s) to query.
+            page_size (int): Number of entries per request.
+
+        Returns:
+            Iterator of (status, entry name, specification name, record id)
+        """
+        return iterate_record_ids_by_status(self.client, dataset, specs, page_size)
+
+    def dataset_sync(
+        self,
+        dataset: BaseDataset,
+        cache: RecordCache,
+        specs: Optional[str | list[str]] = None,
+        fields: tuple[str, ...] = ("properties",),
+        include: Optional[list[str]] = None,
+    ) -> int:
+        """Store completed records created or modified since the last sync in a local cache.
+
+        Args:
+            dataset (BaseDataset): Dataset to sync.
+            cache (RecordCache): Cache to store the records in.
+            specs (str | list(str)): Specification(s) to sync.
+            fields (tuple(str)): Record attributes to store.
+            include (list(str)): Additional fields to fetch for the stored attributes.
+
+        Returns:
+            Number of records stored
+        """
+        return cache.sync(self.client, dataset, specs, fields, include)
+
+    def dataset_export(
+        self,
+        dataset: BaseDataset,
+        properties: Optional[list[str | Column]] = None,
+        specs: Optional[str | list[str]] = None,
+        path: Optional[str] = None,
+        page_size: int = 1000,
+    ) -> dict:
+        """Stream the results of completed records into NumPy columns.
+
+        Args:
+            dataset (BaseDataset): Dataset to export.
+            properties (list(str | Column)): Properties to export, default `export_properties`.
+            specs (str | list(str)): Specification(s) to export.
+            path (str): Directory to write the columns to as `.npy` files, default in memory.
+            page_size (int): Number of records fetched per request.
+
+        Returns:
+            Dictionary of column name to array
+        """
+        if properties is None:
+            properties = list(self.export_properties)
+        return export_dataset(self.client, dataset, properties, specs, path, page_size)
+
+    def wait(
+        self,
+        record_ids: int | list[int],
+        include: Optional[list[str]] = None,
+        timeout: Optional[float] = None,
+        stop: Optional[threading.Event] = None,
+        backoff: Optional[Backoff] = None,
+        page_size: int = 1000,
+    ) -> Iterator[BaseRecord]:
+        """Yield records as they finish (complete, error, cancelled, ...).
+
+        Args:
+            record_ids (int | list(int)): Record id(s) to wait for.
+            include (list(str)): Additional fields to fetch for finished records.
+            timeout (float): Seconds to wait before raising TimeoutError, default no limit.
+            stop (threading.Event): Stop waiting once this event is set.
+            backoff (Backoff): Polling schedule, default 5s doubling up to 5min.
+            page_size (int): Number of record ids per status query.
+
+        Returns:
+            Iterator of finished records
+        """
+        poller = Poller(timeout, stop, backoff)
+        yield from poll(
+            self._wait_steps(record_ids, include, poller, page_size), poller
+        )
+
+    def dataset_wait(
+        self,
+        dataset: BaseDataset,
+        specs: Optional[str | list[str]] = None,
+        include: Optional[list[str]] = None,
+        timeout: Optional[float] = None,
+        stop: Optional[threading.Event] = None,
+        backoff: Optional[Backoff] = None,
+        page_size: int = 1000,
+    ) -> Iterator[tuple[str, str, BaseRecord]]:
+        """Yield the records of a dataset as they finish.
+
+        The server-side status counts are polled, and records are only looked up
+        when those counts change.
+
+        Args:
+            dataset (BaseDataset): Dataset to wait for.
+            specs (str | list(str)): Specification(s) to wait for.
+            include (list(str)): Additional fields to fetch for finished records.
+            timeout (float): Seconds to wait before raising TimeoutError, default no limit.
+            stop (threading.Event): Stop waiting once this event is set.
+            backoff (Backoff): Polling schedule, default 5s doubling up to 5min.
+            page_size (int): Number of finished records fetched per request.
+
+        Returns:
+            Iterator of (entry name, specification name, record)
+        """
+        poller = Poller(timeout, stop, backoff)
+        yield from poll(
+            self._dataset_wait_steps(dataset, specs, include, poller, page_size), poller
+        )
+
+    def _wait_steps(
+        self,
+        record_ids: int | list[int],
+        include: Optional[list[str]],
+        poller: Poller,
+        page_size: int,
+    ) -> Iterator[BaseRecord | Sleep]:
+        # polls of wait; yields Sleep where the driver should wait before polling again
+        if isinstance(record_ids, int):
+            record_ids = [record_ids]
+        pending = set(record_ids)
+
+        while pending and not poller.stopped:
+            # progress skips the sleep, so the deadline is also checked here
+            poller.check(len(pending))
+            ids = list(pending)
+            finished = []
+            for i in range(0, len(ids), page_size):
+                finished.extend(
+                    self.client.query_records(
+                        record_id=ids[i : i + page_size], status=FINISHED_STATUSES
+                    )
+                )
+
+            if finished:
+                poller.backoff.reset()
+                if include is not None:
+                    finished = self.client.get_records(
+                        [rec.id for rec in finished], include=include
+                    )
+                for rec in finished:
+                    pending.discard(rec.id)
+                    yield rec
+                continue
+
+            yield Sleep(len(pending))
+
+    def _dataset_wait_steps(
+        self,
+        dataset: BaseDataset,
+        specs: Optional[str | list[str]],
+        include: Optional[list[str]],
+        poller: Poller,
+        page_size: int,
+    ) -> Iterator[tuple[str, str, BaseRecord] | Sleep]:
+        # polls of dataset_wait; yields Sleep where the driver should wait before polling again
+        if specs is not None:
+            specs = [specs] if isinstance(specs, str) else list(specs)
+        seen = set()  # (entry, spec) already yielded
+        last_counts = None
+        n_pending = 0
+
+        while not poller.stopped:
+            poller.check(n_pending)
+            report = self.dataset_status(dataset, specs)
+            n_pending = report.total() - report.total(FINISHED_STATUSES)
+
+            if report.counts != last_counts:
+                last_counts = report.counts
+                # one status listing, then ids are only paged for newly finished pairs
+                new = {}
+                for entry, spec, status in dataset.detailed_status():
+                    if (
+                        status in FINISHED_STATUSES
+                        and (specs is None or spec in specs)
+                        and (entry, spec) not in seen
+                    ):
+                        new.setdefault(spec, []).append(entry)
+                if new:
+                    poller.backoff.reset()
+
+                page = []
+                for item in fetch_record_ids(
+                    self.client, dataset, new, FINISHED_STATUSES, page_size
+                ):
+                    page.append(item)
+                    if len(page) == page_size:
+                        yield from self.__fetch_finished(page, include, seen)
+                        page = []
+                yield from self.__fetch_finished(page, include, seen)
+
+            if n_pending == 0:
+                return
+            yield Sleep(n_pending)
+
+    def __fetch_finished(
+        self, page: list[tuple[str, str, int]], include: Optional[list[str]], seen: set
+    ) -> Iterator[tuple[str, str, BaseRecord]]:
+        if not page:
+            return
+        records = self.client.get_records(
+            [rec_id for _, _, rec_id in page], include=include
+        )
+        for (entry, spec, _), rec in zip(page, records):
+            seen.add((entry, spec))
+            yield entry, spec, rec
+
+    def _hard_reset(
+        self,
+        dataset: BaseDataset,
+        tag: str,
+        specs: Optional[str | list[str]] = None,
+        batch_size: int = 1000,
+    ) -> tuple[int, int]:
+        """Delete errored/cancelled records of a dataset and resubmit only those.
+
+        Args:
+            dataset (BaseDataset): Dataset to reset.
+            tag (str): Tag to use for the resubmission.
+            specs (str | list(str)): Specification(s) to reset.
+            batch_size (int): Number of records deleted per request.
+
+        Returns:
+            Number of records deleted and number of records resubmitted
+        """
+        failed = {}
+        rec_ids = []
+        for entry, spec, rec_id in self.dataset_status_ids(
+            dataset, [RecordStatusEnum.error, RecordStatusEnum.cancelled], specs
+        ):
+            failed.setdefault(spec, []).append(entry)
+            rec_ids.append(rec_id)
+
+        for i in range(0, len(rec_ids), batch_size):
+            self.client.delete_records(
+                rec_ids[i : i + batch_size], soft_delete=False
+            )  # will also delete child records
+
+        n_submitted = 0
+        for spec, entries in failed.items():
+            dataset.submit(entry_names=entries, specification_names=[spec], tag=tag)
+            n_submitted += len(entries)
+
+        print(
+            f"Deleted {len(rec_ids)} records, resubmitted {n_submitted} "
+            f"across {len(failed)} specification(s)"
+        )
+        return len(rec_ids), n_submitted
+
     @abstractmethod
     def record_add(
         self,
@@ -94,3 +426,6 @@ class BaseQCA(ABC):
         verbose: Optional[bool] = False,
     ) -> None:
         pass
+
+
+instrument_class(BaseQCA)
@@ -0,0 +1,357 @@
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+from datetime import datetime, timezone
+from qcportal import PortalClient
+from qcportal.dataset_models import BaseDataset
+from qcportal.record_models import RecordStatusEnum
+from typing import Iterator, Optional
+from .status import iterate_record_ids
+
+
+class _RecordEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if hasattr(obj, "tolist"):  # numpy arrays and scalars
+            return obj.tolist()
+        if hasattr(obj, "model_dump"):
+            return obj.model_dump()
+        if hasattr(obj, "dict"):
+            return obj.dict()
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        return json.JSONEncoder.default(self, obj)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    record_id INTEGER PRIMARY KEY,
+    status TEXT NOT NULL,
+    modified_on TEXT,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_accessed ON records (accessed);
+CREATE TABLE IF NOT EXISTS entries (
+    dataset_id INTEGER NOT NULL,
+    entry TEXT NOT NULL,
+    specification TEXT NOT NULL,
+    record_id INTEGER NOT NULL,
+    PRIMARY KEY (dataset_id, entry, specification)
+);
+CREATE INDEX IF NOT EXISTS entries_record ON entries (record_id);
+CREATE TABLE IF NOT EXISTS syncs (
+    dataset_id INTEGER NOT NULL,
+    specification TEXT NOT NULL,
+    last_sync TEXT NOT NULL,
+    PRIMARY KEY (dataset_id, specification)
+);
+"""
+_SCHEMA_VERSION = 2
+
+# accessed times are written in batches of this many reads
+_TOUCH_BATCH = 1000
+
+
+class RecordCache:
+    """On-disk cache of record data, keyed by record id.
+
+    Record fields are stored once per record as zlib-compressed JSON in SQLite, and a
+    separate table maps (dataset, entry, specification) to record ids, since the
+    server deduplicates records shared between entries and datasets. Syncing only
+    fetches records modified since the previous sync, and the least recently used
+    records are evicted once the stored data exceeds `max_size` bytes (they come back
+    on a full sync). With `offline=True` the cache is opened read-only and never
+    touches the server.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_size: Optional[int] = 1024**3,
+        offline: bool = False,
+    ):
+        self.__path = os.path.expanduser(path)
+        self.__max_size = max_size
+        self.__offline = offline
+        self.__touched = {}
+
+        if offline:
+            self.__conn = sqlite3.connect(f"file:{self.__path}?mode=ro", uri=True)
+        else:
+            self.__conn = sqlite3.connect(self.__path)
+            (version,) = self.__conn.execute("PRAGMA user_version").fetchone()
+            if version < _SCHEMA_VERSION:
+                # older layouts keyed records by specification; the cache is rebuilt on sync
+                self.__conn.executescript(
+                    "DROP TABLE IF EXISTS records; DROP TABLE IF EXISTS syncs;"
+                )
+            self.__conn.executescript(_SCHEMA)
+            self.__conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+    @property
+    def offline(self) -> bool:
+        return self.__offline
+
+    @property
+    def size(self) -> int:
+        """Total size in bytes of the stored (compressed) record data."""
+        (size,) = self.__conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM records"
+        ).fetchone()
+        return size
+
+    def close(self) -> None:
+        self.flush()
+        self.__conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def __decode(blob: bytes) -> dict:
+        return json.loads(zlib.decompress(blob))
+
+    def __touch(self, record_ids: list[int]) -> None:
+        if self.__offline:
+            return
+        now = time.time()
+        for rec_id in record_ids:
+            self.__touched[rec_id] = now
+        if len(self.__touched) >= _TOUCH_BATCH:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write pending access times, used to pick records to evict, in one transaction."""
+        if self.__offline or not self.__touched:
+            return
+        self.__conn.executemany(
+            "UPDATE records SET accessed = ? WHERE record_id = ?",
+            [(now, rec_id) for rec_id, now in self.__touched.items()],
+        )
+        self.__conn.commit()
+        self.__touched.clear()
+
+    def get(self, record_id: int) -> Optional[dict]:
+        """Get the cached fields of a record.
+
+        Args:
+            record_id (int): Id of the record.
+
+        Returns:
+            Dictionary of the cached fields, or None if the record is not cached
+        """
+        row = self.__conn.execute(
+            "SELECT data FROM records WHERE record_id = ?", (record_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        self.__touch([record_id])
+        return self.__decode(row[0])
+
+    def iterate(
+        self, dataset_id: int, specs: Optional[str | list[str]] = None
+    ) -> Iterator[tuple[str, str, int, dict]]:
+        """Iterate over the cached records of a dataset.
+
+        Args:
+            dataset_id (int): Id of the dataset.
+            specs (str | list(str)): Specification(s) to read, default all.
+
+        Yields:
+            Tuples of (entry name, specification name, record id, fields)
+        """
+        query = (
+            "SELECT e.entry, e.specification, e.record_id, r.data "
+            "FROM entries e JOIN records r ON r.record_id = e.record_id "
+            "WHERE e.dataset_id = ?"
+        )
+        params = [dataset_id]
+        if specs is not None:
+            specs = [specs] if isinstance(specs, str) else list(specs)
+            query += f" AND e.specification IN ({', '.join('?' * len(specs))})"
+            params.extend(specs)
+
+        rows = self.__conn.execute(query, params).fetchall()
+        self.__touch([rec_id for _, _, rec_id, _ in rows])
+        for entry, spec, rec_id, blob in rows:
+            yield entry, spec, rec_id, self.__decode(blob)
+
+    def last_sync(self, dataset_id: int, specification: str) -> Optional[datetime]:
+        """Return when a dataset specification was last synced, or None if never."""
+        row = self.__conn.execute(
+            "SELECT last_sync FROM syncs WHERE dataset_id = ? AND specification = ?",
+            (dataset_id, specification),
+        ).fetchone()
+        return None if row is None else datetime.fromisoformat(row[0])
+
+    def __map_ids(
+        self, client: PortalClient, dataset: BaseDataset, specs: list[str]
+    ) -> set[int]:
+        # store the (entry, specification) -> record id table of completed records
+        mapping = [
+            (dataset.id, entry, spec, rec_id)
+            for entry, spec, rec_id in iterate_record_ids(
+                client, dataset, RecordStatusEnum.complete, specs
+            )
+        ]
+        self.__conn.executemany(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", mapping
+        )
+        return {rec_id for _, _, _, rec_id in mapping}
+
+    def __query(
+        self,
+        client: PortalClient,
+        dataset: BaseDataset,
+        specs: list[str],
+        modified_after: Optional[datetime],
+        include: Optional[list[str]],
+        batch_size: int,
+    ) -> Iterator:
+        # completed records of the given specifications modified after modified_after
+        if not set(dataset.specification_names) <= set(specs):
+            # only some specifications: query their record ids rather than the whole dataset
+            ids = sorted(self.__map_ids(client, dataset, specs))
+            for start in range(0, len(ids), batch_size):
+                yield from client.query_records(
+                    record_id=ids[start : start + batch_size],
+                    status=RecordStatusEnum.complete,
+                    modified_after=modified_after,
+                    include=include,
+                )
+            return
+
+        # every specification: query the dataset, only asking for the ids of new records
+        known = {
+            rec_id
+            for (rec_id,) in self.__conn.execute(
+                "SELECT record_id FROM entries WHERE dataset_id = ?", (dataset.id,)
+            )
+        }
+        mapped = False
+        for rec in client.query_records(
+            dataset_id=dataset.id,
+            status=RecordStatusEnum.complete,
+            modified_after=modified_after,
+            include=include,
+        ):
+            if rec.id not in known and not mapped:
+                known |= self.__map_ids(client, dataset, specs)
+                mapped = True
+            if rec.id in known:
+                yield rec
+
+    def sync(
+        self,
+        client: PortalClient,
+        dataset: BaseDataset,
+        specs: Optional[str | list[str]] = None,
+        fields: tuple[str, ...] = ("properties",),
+        include: Optional[list[str]] = None,
+        batch_size: int = 1000,
+        full: bool = False,
+    ) -> int:
+        """Fetch completed records created or modified since the last sync.
+
+        Args:
+            client (PortalClient): Client the dataset belongs to.
+            dataset (BaseDataset): Dataset to sync.
+            specs (str | list(str)): Specification(s) to sync, default all.
+            fields (tuple(str)): Record attributes to store.
+            include (list(str)): Additional fields to fetch for the stored attributes.
+            batch_size (int): Number of records written per transaction.
+            full (bool): Whether to refetch every record, e.g. to restore evicted ones.
+
+        Returns:
+            Number of records stored
+        """
+        if self.__offline:
+            raise RuntimeError("Cannot sync a cache opened in offline mode")
+
+        started = datetime.now(timezone.utc)
+        if specs is None:
+            specs = dataset.specification_names
+        elif isinstance(specs, str):
+            specs = [specs]
+
+        last = [self.last_sync(dataset.id, spec) for spec in specs]
+        modified_after = None if full or None in last else min(last)
+
+        rows = []
+        n_stored = 0
+        for rec in self.__query(
+            client, dataset, specs, modified_after, include, batch_size
+        ):
+            data = {f: getattr(rec, f, None) for f in fields}
+            blob = zlib.compress(json.dumps(data, cls=_RecordEncoder).encode())
+            rows.append(
+                (
+                    rec.id,
+                    rec.status.value,
+                    rec.modified_on.isoformat(),
+                    blob,
+                    len(blob),
+                    time.time(),
+                )
+            )
+
+            if len(rows) >= batch_size:
+                n_stored += self.__write(rows)
+                rows = []
+
+        n_stored += self.__write(rows)
+        self.__conn.executemany(
+            "INSERT OR REPLACE INTO syncs VALUES (?, ?, ?)",
+            [(dataset.id, spec, started.isoformat()) for spec in specs],
+        )
+        self.__conn.commit()
+        self.evict()
+
+        return n_stored
+
+    def __write(self, rows: list[tuple]) -> int:
+        self.__conn.executemany(
+            "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?)", rows
+        )
+        self.__conn.commit()
+        return len(rows)
+
+    def evict(self) -> int:
+        """Drop least recently used records until the cache fits in `max_size`.
+
+        Returns:
+            Number of records evicted
+        """
+        if self.__offline or self.__max_size is None:
+            return 0
+
+        self.flush()
+        excess = self.size - self.__max_size
+        if excess <= 0:
+            return 0
+
+        evict = []
+        for rec_id, size in self.__conn.execute(
+            "SELECT record_id, size FROM records ORDER BY accessed"
+        ):
+            evict.append((rec_id,))
+            excess -= size
+            if excess <= 0:
+                break
+
+        self.__conn.executemany("DELETE FROM records WHERE record_id = ?", evict)
+        self.__conn.commit()
+        return len(evict)
+
+    def __repr__(self) -> str:
+        return (
+            f"RecordCache({self.__path!r}, size={self.size}, offline={self.__offline})"
+        )
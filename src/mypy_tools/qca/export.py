@@ -0,0 +1,252 @@
+import json
+import os
+
+import numpy as np
+
+from qcportal import PortalClient
+from qcportal.dataset_models import BaseDataset
+from qcportal.record_models import BaseRecord, RecordStatusEnum
+from typing import Callable, Optional
+from .status import dataset_status, iterate_record_ids
+
+
+class Column:
+    """A property extracted from each record into a NumPy column.
+
+    Ragged columns (e.g. geometries) are stored flattened with CSR-style offsets.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        getter: Callable[[BaseRecord], object],
+        dtype: str = "f8",
+        ragged: bool = False,
+        include: tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.getter = getter
+        self.dtype = np.dtype(dtype)
+        self.ragged = ragged
+        self.include = include
+
+    def __call__(self, rec: BaseRecord):
+        try:
+            value = self.getter(rec)
+        except (AttributeError, IndexError, KeyError, TypeError):
+            value = None
+        if self.ragged:
+            return np.empty(0, self.dtype) if value is None else np.ravel(value)
+        return np.nan if value is None else value
+
+
+def _property(name: str) -> Column:
+    return Column(name, lambda rec: rec.properties[name])
+
+
+COLUMNS = {
+    "return_energy": _property("return_energy"),
+    "cp_corrected_interaction_energy": _property("cp_corrected_interaction_energy"),
+    "nocp_corrected_interaction_energy": _property("nocp_corrected_interaction_energy"),
+    "vmfc_corrected_interaction_energy": _property("vmfc_corrected_interaction_energy"),
+    "final_energy": Column("final_energy", lambda rec: rec.energies[-1]),
+    "final_geometry": Column(
+        "final_geometry",
+        lambda rec: rec.final_molecule.geometry,
+        ragged=True,
+        include=("final_molecule",),
+    ),
+}
+
+
+def _column(prop: str | Column) -> Column:
+    if isinstance(prop, Column):
+        return prop
+    return COLUMNS.get(prop, _property(prop))
+
+
+class _Sink:
+    """Preallocated output columns, in memory or as files in a directory."""
+
+    def __init__(self, columns: list[Column], n_rows: int, path: Optional[str]):
+        self.path = path
+        self.n_rows = n_rows
+        self.arrays = {}
+        self.__ragged = {}
+        self.__ragged_dtypes = {}
+        # one value per row, trimmed to the rows filled on close
+        self.__fixed = ["record_id", "specification"]
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            self.__entries = open(os.path.join(path, "entry.txt"), "w")
+        else:
+            self.arrays["entry"] = np.empty(n_rows, dtype=object)
+            self.__fixed.append("entry")
+
+        self.arrays["record_id"] = self.__alloc("record_id", np.int64, n_rows)
+        self.arrays["specification"] = self.__alloc("specification", np.int32, n_rows)
+        for col in columns:
+            if col.ragged:
+                self.arrays[f"{col.name}_offsets"] = self.__alloc(
+                    f"{col.name}_offsets", np.int64, n_rows + 1
+                )
+                self.arrays[f"{col.name}_offsets"][0] = 0
+                self.__ragged_dtypes[col.name] = col.dtype
+                if path is not None:
+                    self.__ragged[col.name] = open(
+                        os.path.join(path, f"{col.name}.bin"), "wb"
+                    )
+                else:
+                    self.__ragged[col.name] = []
+            else:
+                self.arrays[col.name] = self.__alloc(col.name, col.dtype, n_rows)
+                self.__fixed.append(col.name)
+
+    def __alloc(self, name: str, dtype, n: int) -> np.ndarray:
+        if self.path is None:
+            return np.empty(n, dtype=dtype)
+        return np.lib.format.open_memmap(
+            os.path.join(self.path, f"{name}.npy"), mode="w+", dtype=dtype, shape=(n,)
+        )
+
+    def write_entries(self, start: int, entries: list[str]) -> None:
+        if self.path is None:
+            self.arrays["entry"][start : start + len(entries)] = entries
+        else:
+            self.__entries.writelines(f"{e}\n" for e in entries)
+
+    def write_ragged(
+        self, name: str, values: list[np.ndarray], start: int, dtype
+    ) -> None:
+        offsets = self.arrays[f"{name}_offsets"]
+        offsets[start + 1 : start + 1 + len(values)] = offsets[start] + np.cumsum(
+            [len(v) for v in values]
+        )
+        flat = np.concatenate(values).astype(dtype) if values else np.empty(0, dtype)
+        if self.path is None:
+            self.__ragged[name].append(flat)
+        else:
+            flat.tofile(self.__ragged[name])
+
+    def close(
+        self, n_filled: int, spec_names: list[str], columns: list[Column]
+    ) -> dict:
+        for name, out in self.__ragged.items():
+            if self.path is None:
+                self.arrays[name] = (
+                    np.concatenate(out)
+                    if out
+                    else np.empty(0, dtype=self.__ragged_dtypes[name])
+                )
+            else:
+                out.close()
+
+        if self.path is None:
+            for name in self.__fixed:
+                self.arrays[name] = self.arrays[name][:n_filled]
+            for name in self.__ragged:
+                self.arrays[f"{name}_offsets"] = self.arrays[f"{name}_offsets"][
+                    : n_filled + 1
+                ]
+        else:
+            self.__entries.close()
+            for arr in self.arrays.values():
+                arr.flush()
+            with open(os.path.join(self.path, "columns.json"), "w") as f:
+                json.dump(
+                    {
+                        "n_rows": n_filled,
+                        "specifications": spec_names,
+                        "columns": [c.name for c in columns],
+                        "dtypes": {
+                            name: self.arrays[name].dtype.str for name in self.__fixed
+                        },
+                        "ragged": {
+                            name: {
+                                "file": f"{name}.bin",
+                                "dtype": dtype.str,
+                                "offsets": f"{name}_offsets.npy",
+                                "length": int(self.arrays[f"{name}_offsets"][n_filled]),
+                            }
+                            for name, dtype in self.__ragged_dtypes.items()
+                        },
+                    },
+                    f,
+                    indent=4,
+                )
+
+        self.arrays["specification_names"] = np.array(spec_names, dtype=object)
+        return self.arrays
+
+
+def export_dataset(
+    client: PortalClient,
+    dataset: BaseDataset,
+    properties: list[str | Column],
+    specs: Optional[str | list[str]] = None,
+    path: Optional[str] = None,
+    page_size: int = 1000,
+) -> dict[str, np.ndarray]:
+    """Stream completed records of a dataset into NumPy columns.
+
+    Records are fetched one page at a time and written into columns preallocated from
+    the server-side record counts, so only one page of records is in memory at once.
+    With `path`, the columns are `.npy` memmaps in that directory (ragged columns are
+    raw `.bin` files plus `_offsets.npy`), entry names go to `entry.txt` and
+    `columns.json` describes the layout: the number of rows filled, the dtype of each
+    fixed-width column and the file, dtype, offsets file and length of each ragged one.
+
+    Args:
+        client (PortalClient): Client the dataset belongs to.
+        dataset (BaseDataset): Dataset to export.
+        properties (list(str | Column)): Properties to export, by name or as a Column.
+        specs (str | list(str)): Specification(s) to export, default all.
+        path (str): Directory to write the columns to, default keep them in memory.
+        page_size (int): Number of records fetched per request.
+
+    Returns:
+        Dictionary of column name to array. `specification` holds indices into
+        `specification_names`.
+    """
+    columns = [_column(p) for p in properties]
+    include = sorted({f for c in columns for f in c.include}) or None
+
+    if specs is None:
+        specs = dataset.specification_names
+    elif isinstance(specs, str):
+        specs = [specs]
+    spec_index = {spec: i for i, spec in enumerate(specs)}
+
+    n_rows = dataset_status(dataset, specs).total(RecordStatusEnum.complete)
+    sink = _Sink(columns, n_rows, path)
+
+    def flush(page: list[tuple[str, str, int]], start: int) -> int:
+        # the dataset may gain records after it was counted; those are left out
+        page = page[: n_rows - start]
+        if not page:
+            return start
+        records = client.get_records([rec_id for _, _, rec_id in page], include=include)
+        stop = start + len(page)
+
+        sink.write_entries(start, [entry for entry, _, _ in page])
+        sink.arrays["record_id"][start:stop] = [rec_id for _, _, rec_id in page]
+        sink.arrays["specification"][start:stop] = [spec_index[s] for _, s, _ in page]
+        for col in columns:
+            values = [col(rec) for rec in records]
+            if col.ragged:
+                sink.write_ragged(col.name, values, start, col.dtype)
+            else:
+                sink.arrays[col.name][start:stop] = values
+        return stop
+
+    n_filled = 0
+    page = []
+    for item in iterate_record_ids(client, dataset, RecordStatusEnum.complete, specs):
+        page.append(item)
+        if len(page) == page_size:
+            n_filled = flush(page, n_filled)
+            page = []
+    n_filled = flush(page, n_filled)
+
+    return sink.close(n_filled, specs, columns)
@@ -0,0 +1,272 @@
+import bisect
+import functools
+import inspect
+import json
+import re
+import threading
+import time
+
+from typing import Any, Callable, Optional
+from urllib.parse import urlsplit
+
+_ID_RE = re.compile(r"/\d+(?=/|$)")
+
+
+class CallEvent:
+    """Timing and transfer counts of one wrapper method or HTTP request."""
+
+    __slots__ = (
+        "name",
+        "kind",
+        "start",
+        "latency",
+        "round_trips",
+        "bytes_sent",
+        "bytes_received",
+        "records",
+        "error",
+    )
+
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind
+        self.start = time.time()
+        self.latency = 0.0
+        self.round_trips = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.records = None
+        self.error = None
+
+    def to_dict(self) -> dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+class HistogramSink:
+    """In-memory per-call statistics with a log-scale latency histogram."""
+
+    # bucket upper bounds in seconds, 1ms to ~10min
+    bounds = [1e-3 * 2**i for i in range(20)]
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__stats = {}
+
+    def record(self, event: CallEvent) -> None:
+        with self.__lock:
+            stats = self.__stats.setdefault(
+                (event.kind, event.name),
+                {
+                    "calls": 0,
+                    "errors": 0,
+                    "round_trips": 0,
+                    "bytes_sent": 0,
+                    "bytes_received": 0,
+                    "records": 0,
+                    "latency_total": 0.0,
+                    "latency_max": 0.0,
+                    "buckets": [0] * (len(self.bounds) + 1),
+                },
+            )
+            stats["calls"] += 1
+            stats["errors"] += event.error is not None
+            stats["round_trips"] += event.round_trips
+            stats["bytes_sent"] += event.bytes_sent
+            stats["bytes_received"] += event.bytes_received
+            stats["records"] += event.records or 0
+            stats["latency_total"] += event.latency
+            stats["latency_max"] = max(stats["latency_max"], event.latency)
+            stats["buckets"][bisect.bisect_left(self.bounds, event.latency)] += 1
+
+    def quantile(self, kind: str, name: str, q: float) -> float:
+        """Upper bound of the latency bucket containing quantile `q` of a call."""
+        buckets = self.__stats[(kind, name)]["buckets"]
+        target = q * sum(buckets)
+        seen = 0
+        for bound, count in zip(self.bounds + [float("inf")], buckets):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def summary(self) -> dict[str, dict]:
+        """Return the statistics of every call, keyed by "kind:name"."""
+        with self.__lock:
+            out = {}
+            for (kind, name), stats in self.__stats.items():
+                out[f"{kind}:{name}"] = dict(
+                    stats,
+                    buckets=list(stats["buckets"]),
+                    latency_mean=stats["latency_total"] / stats["calls"],
+                    latency_p50=self.quantile(kind, name, 0.5),
+                    latency_p95=self.quantile(kind, name, 0.95),
+                )
+            return out
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__stats.clear()
+
+
+class JsonLinesSink:
+    """Appends one JSON object per event to a file."""
+
+    def __init__(self, path: str):
+        self.__lock = threading.Lock()
+        self.__file = open(path, "a")
+
+    def record(self, event: CallEvent) -> None:
+        line = json.dumps(event.to_dict())
+        with self.__lock:
+            self.__file.write(line + "\n")
+            self.__file.flush()
+
+    def close(self) -> None:
+        self.__file.close()
+
+
+class _State(threading.local):
+    def __init__(self):
+        self.active = []
+
+
+_enabled = False
+_sinks = []
+_local = _State()
+
+
+def enable(*sinks) -> None:
+    """Turn instrumentation on, sending events to the given sinks (added to any existing ones)."""
+    global _enabled
+    _sinks.extend(sinks)
+    _enabled = True
+
+
+def disable(clear_sinks: bool = False) -> None:
+    """Turn instrumentation off, optionally forgetting the sinks."""
+    global _enabled
+    _enabled = False
+    if clear_sinks:
+        _sinks.clear()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _emit(event: CallEvent) -> None:
+    for sink in _sinks:
+        sink.record(event)
+
+
+def _count_records(result: Any) -> Optional[int]:
+    if isinstance(result, (list, tuple, dict, set)):
+        return len(result)
+    return None
+
+
+def _instrumented_generator(gen, event: CallEvent, t0: float):
+    event.records = 0
+    try:
+        while True:
+            # only count requests made while the generator runs, not while the caller does
+            _local.active.append(event)
+            try:
+                item = next(gen)
+            except StopIteration:
+                return
+            finally:
+                _local.active.remove(event)
+            event.records += 1
+            yield item
+    except Exception as e:
+        event.error = repr(e)
+        raise
+    finally:
+        gen.close()
+        event.latency = time.perf_counter() - t0
+        _emit(event)
+
+
+def instrument_method(func: Callable, name: str) -> Callable:
+    """Wrap a function so each call emits a CallEvent while instrumentation is enabled."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return func(*args, **kwargs)
+
+        event = CallEvent(name, "qca")
+        t0 = time.perf_counter()
+        _local.active.append(event)
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            event.error = repr(e)
+            event.latency = time.perf_counter() - t0
+            _emit(event)
+            raise
+        finally:
+            _local.active.remove(event)
+
+        if inspect.isgenerator(result):
+            # time the whole iteration, not just creating the generator
+            return _instrumented_generator(result, event, t0)
+
+        event.latency = time.perf_counter() - t0
+        event.records = _count_records(result)
+        _emit(event)
+        return result
+
+    return wrapper
+
+
+def instrument_class(cls: type) -> None:
+    """Instrument the public, non-abstract methods defined directly on a class."""
+    for attr, value in list(vars(cls).items()):
+        if (
+            attr.startswith("_")
+            or not inspect.isfunction(value)
+            or getattr(value, "__isabstractmethod__", False)
+            or getattr(value, "__instrumented__", False)
+        ):
+            continue
+        wrapped = instrument_method(value, f"{cls.__name__}.{attr}")
+        wrapped.__instrumented__ = True
+        setattr(cls, attr, wrapped)
+
+
+def instrument_client(client) -> None:
+    """Count the HTTP round-trips and bytes of a PortalClient (once per client)."""
+    send = getattr(client, "_send_request", None)
+    if send is None or getattr(send, "__instrumented__", False):
+        return
+
+    @functools.wraps(send)
+    def send_request(req, *args, **kwargs):
+        if not _enabled:
+            return send(req, *args, **kwargs)
+
+        endpoint = _ID_RE.sub("/{id}", urlsplit(req.url).path)
+        event = CallEvent(f"{req.method} {endpoint}", "http")
+        event.round_trips = 1
+        body = req.data
+        event.bytes_sent = len(body) if isinstance(body, (bytes, str)) else 0
+        t0 = time.perf_counter()
+        try:
+            response = send(req, *args, **kwargs)
+            event.bytes_received = len(response.content)
+            return response
+        except Exception as e:
+            event.error = repr(e)
+            raise
+        finally:
+            event.latency = time.perf_counter() - t0
+            for active in _local.active:
+                active.round_trips += 1
+                active.bytes_sent += event.bytes_sent
+                active.bytes_received += event.bytes_received
+            _emit(event)
+
+    send_request.__instrumented__ = True
+    client._send_request = send_request
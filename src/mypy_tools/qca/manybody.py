@@ -1,5 +1,5 @@
-import hashlib
-import json
+import numpy as np
+import qcelemental as qcel
 
 from qcelemental.models.molecule import Molecule
 from qcportal.singlepoint import QCSpecification
@@ -8,12 +8,67 @@ from qcportal.manybody import (
     ManybodySpecification,
     BSSECorrectionEnum,
 )
-from qcportal.record_models import RecordStatusEnum
 from typing import Optional
+from ..misc.geometry import max_nmer_order
 from .base import BaseQCA
 
+# a level is either a full QCSpecification or overrides of the default program/method/basis/keywords
+Levels = dict[int | str, QCSpecification | dict]
+
+
+def _build_levels(
+    program: str,
+    method: str,
+    basis: str,
+    kwargs: dict,
+    levels: Optional[int | Levels],
+) -> dict[int | str, QCSpecification]:
+    if levels is None:
+        levels = 2
+    if isinstance(levels, int):
+        levels = {n: {} for n in range(1, levels + 1)}
+
+    built = {}
+    for n, level in levels.items():
+        if isinstance(level, QCSpecification):
+            built[n] = level
+            continue
+        built[n] = QCSpecification(
+            program=level.get("program", program),
+            driver="energy",
+            method=level.get("method", method),
+            basis=level.get("basis", basis),
+            keywords=level.get("keywords", kwargs),
+        )
+
+    return built
+
+
+def _bsse(bsse_correction: Optional[str | list[str]]) -> list[BSSECorrectionEnum]:
+    if bsse_correction is None:
+        return [BSSECorrectionEnum.cp]
+    if isinstance(bsse_correction, str):
+        bsse_correction = [bsse_correction]
+    return [BSSECorrectionEnum(b.lower()) for b in bsse_correction]
+
+
+def _levels_key(levels: dict[int | str, QCSpecification]) -> dict:
+    return {
+        str(n): [spec.program, spec.method, spec.basis, spec.keywords]
+        for n, spec in levels.items()
+    }
+
+
+def _max_nbody_within(mol: Molecule, cutoff: float, max_n: int) -> int:
+    """Largest n for which some n-mer has all of its fragments within `cutoff` (Angstrom) of each other."""
+    geom = np.asarray(mol.geometry).reshape(-1, 3) * qcel.constants.bohr2angstroms
+    fragments = [np.asarray(frag, dtype=np.int64) for frag in mol.fragments]
+    return max_nmer_order(geom, fragments, max_n, cutoff)
+
 
 class ManybodyQCA(BaseQCA):
+    export_properties = ("cp_corrected_interaction_energy",)
+
     def __init__(self, address: str, port: int, username: str, password: str):
         super().__init__(address, port, username, password)
         self.computation_type = "manybody"
@@ -25,6 +80,9 @@ class ManybodyQCA(BaseQCA):
         method: str,
         basis: str,
         tag: str,
+        levels: Optional[int | Levels] = None,
+        bsse_correction: Optional[str | list[str]] = None,
+        cutoff: Optional[float] = None,
         **kwargs,
     ) -> list[int]:
         """Add a manybody calculation to the queue.
@@ -35,29 +93,48 @@ class ManybodyQCA(BaseQCA):
             method (str): Method to use for the calculation.
             basis (str): Basis set to use for the calculation.
             tag (str): Tag to use for the calculation.
+            levels (int | dict): Highest n-body level, or a dict of n-body level (or
+                "supersystem") to a QCSpecification or to a dict overriding
+                "program", "method", "basis" and/or "keywords". Default {1: spec, 2: spec}.
+            bsse_correction (str | list(str)): BSSE treatment(s): "cp", "nocp" and/or "vmfc".
+                Default "cp".
+            cutoff (float): Drop the n-body levels of a molecule for which no n-mer has
+                all of its fragments within this distance (Angstrom) of each other.
             **kwargs: Additional arguments to pass to the calculation.
 
         Returns:
             None
         """
-        spec = QCSpecification(
-            program=program,
-            driver="energy",
-            method=method,
-            basis=basis,
-            keywords=kwargs,
-        )
-        _, ids = self.client.add_manybodys(
-            mols,
-            program="qcmanybody",
-            bsse_correction=[BSSECorrectionEnum.cp],
-            levels={
-                1: spec,
-                2: spec,
-            },
-            keywords={},
-            tag=tag,
-        )
+        built = _build_levels(program, method, basis, kwargs, levels)
+        bsse = _bsse(bsse_correction)
+
+        if isinstance(mols, Molecule):
+            mols = [mols]
+
+        # molecules truncated to the same levels are submitted together
+        groups = {}
+        max_n = max((n for n in built if isinstance(n, int)), default=1)
+        for i, mol in enumerate(mols):
+            n_eff = max_n if cutoff is None else _max_nbody_within(mol, cutoff, max_n)
+            groups.setdefault(n_eff, []).append(i)
+
+        ids = [None] * len(mols)
+        for n_eff, idx in groups.items():
+            group_levels = {
+                n: spec
+                for n, spec in built.items()
+                if not isinstance(n, int) or n <= max(n_eff, 1)
+            }
+            _, group_ids = self.client.add_manybodys(
+                [mols[i] for i in idx],
+                program="qcmanybody",
+                bsse_correction=bsse,
+                levels=group_levels,
+                keywords={},
+                tag=tag,
+            )
+            for i, rec_id in zip(idx, group_ids):
+                ids[i] = rec_id
 
         return ids
 
@@ -96,6 +173,8 @@ class ManybodyQCA(BaseQCA):
         program: str,
         method: str,
         basis: str,
+        levels: Optional[int | Levels] = None,
+        bsse_correction: Optional[str | list[str]] = None,
         **kwargs,
     ) -> str:
         """Add a specification to the dataset.
@@ -105,42 +184,41 @@ class ManybodyQCA(BaseQCA):
             program (str): Program to use for the calculation.
             method (str): Method to use for the calculation.
             basis (str): Basis set to use for the calculation.
+            levels (int | dict): n-body levels, as in record_add. Default {1: spec, 2: spec}.
+            bsse_correction (str | list(str)): BSSE treatment(s), default "cp".
             **kwargs: Additional arguments to pass to the calculation.
 
         Returns:
-            Name of the specification
+            Name of the specification. Specifications equal to the default one (e.g.
+            levels=2) share its name.
         """
-        spec = QCSpecification(
-            program=program,
-            driver="energy",
-            method=method,
-            basis=basis,
-            keywords=kwargs,
-        )
-
-        # assuming only dimer calculations for now
+        built = _build_levels(program, method, basis, kwargs, levels)
+        bsse = _bsse(bsse_correction)
         manybody_spec = ManybodySpecification(
             program="qcmanybody",
-            bsse_correction=[BSSECorrectionEnum.cp],
-            levels={
-                1: spec,
-                2: spec,
-            },
+            bsse_correction=bsse,
+            levels=built,
         )
 
-        kwarg_str = json.dumps(kwargs, sort_keys=True)
-        kwarg_hash = hashlib.md5(
-            kwarg_str.encode()
-        ).hexdigest()  # TODO: make work with nested kwargs
-
-        spec_name = f"{program}/{method}/{basis}/{kwarg_hash}"
-
-        dataset.add_specification(
-            name=spec_name,
-            specification=manybody_spec,
-        )
-
-        return spec_name
+        # the default dimer/cp specification keeps its original name, however it is given
+        legacy_name = None
+        if bsse == [BSSECorrectionEnum.cp] and built == _build_levels(
+            program, method, basis, kwargs, None
+        ):
+            spec_name = self.registry.spec_name(program, method, basis, kwargs)
+            legacy_name = self.registry.legacy_spec_name(program, method, basis, kwargs)
+        else:
+            spec_name = self.registry.spec_name(
+                program,
+                method,
+                basis,
+                {
+                    "keywords": kwargs,
+                    "levels": _levels_key(built),
+                    "bsse_correction": [b.value for b in bsse],
+                },
+            )
+        return self.registry.add(dataset, spec_name, manybody_spec, legacy_name)
 
     # kinda useless atm
     def dataset_submit(
@@ -180,15 +258,7 @@ class ManybodyQCA(BaseQCA):
             None
         """
         if hard_reset:
-            for _, _, rec in dataset.iterate_records(
-                status=[RecordStatusEnum.error, RecordStatusEnum.cancelled],
-                specification_names=specs,
-            ):
-                self.client.delete_records(
-                    rec.id, soft_delete=False
-                )  # will also delete child records
-            self.dataset_check(dataset, verbose=True)
-            dataset.submit(tag=tag, specification_names=specs)
+            self._hard_reset(dataset, tag, specs)
 
         else:
             dataset.set_tags([tag])
@@ -219,12 +289,16 @@ class ManybodyQCA(BaseQCA):
 
         Args:
             dataset (ManybodyDataset): Dataset to check.
+            specs (str | list(str)): Specification(s) to check.
             verbose (bool): Whether to print detailed record status.
 
         Returns:
             None
         """
-        dataset.print_status()
+        report = self.dataset_status(dataset, specs)
+        print(report.table())
         if verbose:
-            for _, _, rec in dataset.iterate_records(specification_names=specs):
-                print(f"Record {rec.id}: {rec.status}")
+            for status, _, _, rec_id in self.dataset_status_ids_by_status(
+                dataset, specs
+            ):
+                print(f"Record {rec_id}: {status.value}")
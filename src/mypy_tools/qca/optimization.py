@@ -1,17 +1,18 @@
-import hashlib
-import json
-
 from qcelemental.models.molecule import Molecule
 from qcportal.singlepoint import QCSpecification
 from qcportal.optimization import (
     OptimizationDataset,
     OptimizationSpecification,
 )
+from qcportal.record_models import RecordStatusEnum
 from typing import Optional
 from .base import BaseQCA
+from .trajectory import TrajectorySet, load_trajectories
 
 
 class OptimizationQCA(BaseQCA):
+    export_properties = ("final_energy", "final_geometry")
+
     def __init__(self, address: str, port: int, username: str, password: str):
         super().__init__(address, port, username, password)
         self.computation_type = "optimization"
@@ -117,20 +118,13 @@ class OptimizationQCA(BaseQCA):
             qc_specification=spec,
         )
 
-        kwarg_str = json.dumps(kwargs, sort_keys=True)
-        kwarg_hash = hashlib.md5(
-            kwarg_str.encode()
-        ).hexdigest()  # TODO: make work with nested kwargs
-
-        spec_name = f"{program}/{method}/{basis}/{kwarg_hash}"
-
-        dataset.add_specification(
-            name=spec_name,
-            specification=opt_spec,
+        return self.registry.add(
+            dataset,
+            self.registry.spec_name(program, method, basis, kwargs),
+            opt_spec,
+            self.registry.legacy_spec_name(program, method, basis, kwargs),
         )
 
-        return spec_name
-
     def dataset_submit(
         self,
         dataset: OptimizationDataset,
@@ -168,15 +162,7 @@ class OptimizationQCA(BaseQCA):
             None
         """
         if hard_reset:
-            for _, _, rec in dataset.iterate_records(
-                status=["error", "cancelled"],
-                specification_names=specs,
-            ):
-                self.client.delete_records(
-                    rec.id, soft_delete=False
-                )  # will also delete child records
-            self.dataset_check(dataset, verbose=True)
-            dataset.submit(tag=tag, specification_names=specs)
+            self._hard_reset(dataset, tag, specs)
 
         else:
             dataset.set_tags([tag])
@@ -206,11 +192,46 @@ class OptimizationQCA(BaseQCA):
 
         Args:
             dataset (OptimizationDataset): Dataset to check.
+            specs (str | list(str)): Specification(s) to check.
+            verbose (bool): Whether to print detailed record status.
 
         Returns:
             None
         """
-        dataset.print_status()
+        report = self.dataset_status(dataset, specs)
+        print(report.table())
         if verbose:
-            for _, _, rec in dataset.iterate_records(specification_names=specs):
-                print(f"Record {rec.id}: {rec.status}")
+            for status, _, _, rec_id in self.dataset_status_ids_by_status(
+                dataset, specs
+            ):
+                print(f"Record {rec_id}: {status.value}")
+
+    def load_trajectories(
+        self,
+        record_ids: Optional[list[int]] = None,
+        dataset: Optional[OptimizationDataset] = None,
+        specs: Optional[str | list[str]] = None,
+        batch_size: int = 100,
+    ) -> TrajectorySet:
+        """Load optimization trajectories into packed arrays.
+
+        Args:
+            record_ids (list(int)): Ids of the optimizations to load.
+            dataset (OptimizationDataset): Dataset whose completed optimizations to load instead.
+            specs (str | list(str)): Specification(s) of the dataset to load.
+            batch_size (int): Number of optimizations fetched per batch.
+
+        Returns:
+            TrajectorySet of the optimizations
+        """
+        if record_ids is None:
+            if dataset is None:
+                raise ValueError("Either record_ids or dataset must be given")
+            record_ids = [
+                rec_id
+                for _, _, rec_id in self.dataset_status_ids(
+                    dataset, RecordStatusEnum.complete, specs
+                )
+            ]
+
+        return load_trajectories(self.client, record_ids, batch_size)
@@ -1,6 +1,3 @@
-import hashlib
-import json
-
 from qcelemental.models.molecule import Molecule
 from qcportal.singlepoint import SinglepointDataset, QCSpecification
 from typing import Optional
@@ -8,6 +5,8 @@ from .base import BaseQCA
 
 
 class SinglepointQCA(BaseQCA):
+    export_properties = ("return_energy",)
+
     def __init__(self, address: str, port: int, username: str, password: str):
         super().__init__(address, port, username, password)
         self.computation_type = "singlepoint"
@@ -104,20 +103,13 @@ class SinglepointQCA(BaseQCA):
             keywords=kwargs,
         )
 
-        kwarg_str = json.dumps(kwargs, sort_keys=True)
-        kwarg_hash = hashlib.md5(
-            kwarg_str.encode()
-        ).hexdigest()  # TODO: make work with nested kwargs
-
-        spec_name = f"{program}/{method}/{basis}/{kwarg_hash}"
-
-        dataset.add_specification(
-            name=spec_name,
-            specification=spec,
+        return self.registry.add(
+            dataset,
+            self.registry.spec_name(program, method, basis, kwargs),
+            spec,
+            self.registry.legacy_spec_name(program, method, basis, kwargs),
         )
 
-        return spec_name
-
     def dataset_submit(
         self,
         dataset: SinglepointDataset,
@@ -155,13 +147,7 @@ class SinglepointQCA(BaseQCA):
             None
         """
         if hard_reset:
-            for _, _, rec in dataset.iterate_records(
-                status=["error", "cancelled"],
-                specification_names=specs,
-            ):
-                self.client.delete_records(rec.id, soft_delete=False)
-            self.dataset_check(dataset, verbose=True)
-            dataset.submit(tag=tag, specification_names=specs)
+            self._hard_reset(dataset, tag, specs)
 
         else:
             dataset.set_tags([tag])
@@ -191,11 +177,16 @@ class SinglepointQCA(BaseQCA):
 
         Args:
             dataset (SinglepointDataset): Dataset to check.
+            specs (str | list(str)): Specification(s) to check.
+            verbose (bool): Whether to print detailed record status.
 
         Returns:
             None
         """
-        dataset.print_status()
+        report = self.dataset_status(dataset, specs)
+        print(report.table())
         if verbose:
-            for _, _, rec in dataset.iterate_records(specification_names=specs):
-                print(f"Record {rec.id}: {rec.status}")
+            for status, _, _, rec_id in self.dataset_status_ids_by_status(
+                dataset, specs
+            ):
+                print(f"Record {rec_id}: {status.value}")
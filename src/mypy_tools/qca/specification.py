@@ -0,0 +1,177 @@
+import hashlib
+import json
+import math
+
+from qcportal.dataset_models import BaseDataset
+from typing import Any, Optional
+
+
+def canonicalize_keywords(kwargs: Any, float_digits: int = 12) -> Any:
+    """Convert (possibly nested) keywords into a canonical, JSON-serializable form.
+
+    Keys are lowercased and stripped, since program keywords are case-insensitive.
+    Values are left as they are, as some (e.g. file paths) are case-sensitive, except
+    that floats are rounded to `float_digits` significant digits. Tuples and sets
+    become lists (sets are sorted) and numpy scalars/arrays are converted to Python
+    objects.
+
+    Args:
+        kwargs (Any): Keywords to canonicalize.
+        float_digits (int): Number of significant digits to keep for floats.
+
+    Returns:
+        Canonical copy of the keywords.
+    """
+    if hasattr(kwargs, "tolist"):  # numpy scalars and arrays
+        kwargs = kwargs.tolist()
+
+    if isinstance(kwargs, dict):
+        return {
+            str(k).strip().lower(): canonicalize_keywords(v, float_digits)
+            for k, v in kwargs.items()
+        }
+    if isinstance(kwargs, (list, tuple)):
+        return [canonicalize_keywords(v, float_digits) for v in kwargs]
+    if isinstance(kwargs, (set, frozenset)):
+        items = [canonicalize_keywords(v, float_digits) for v in kwargs]
+        return sorted(items, key=lambda v: json.dumps(v, sort_keys=True))
+    if isinstance(kwargs, bool) or kwargs is None:
+        return kwargs
+    if isinstance(kwargs, float):
+        if not math.isfinite(kwargs):
+            return str(kwargs)
+        return float(f"{kwargs:.{float_digits}g}")
+    return kwargs
+
+
+def hash_keywords(kwargs: dict) -> str:
+    """Stable md5 hash of canonicalized keywords.
+
+    For flat keywords with lowercase keys and floats of at most `float_digits`
+    significant digits this matches the `json.dumps(kwargs, sort_keys=True)` hash of
+    earlier spec names; other keywords get a different name than before (see
+    `SpecificationRegistry.legacy_spec_name`).
+
+    Args:
+        kwargs (dict): Keywords to hash.
+
+    Returns:
+        Hex digest of the canonical keywords.
+    """
+    kwarg_str = json.dumps(canonicalize_keywords(kwargs), sort_keys=True)
+    return hashlib.md5(kwarg_str.encode()).hexdigest()
+
+
+class SpecificationRegistry:
+    """Names specifications and caches the specification names of each dataset.
+
+    The names of a dataset's specifications are fetched from the server once and
+    kept locally, so adding a specification that already exists costs no round-trip.
+    """
+
+    def __init__(self):
+        self.__known = {}
+
+    @staticmethod
+    def spec_name(program: str, method: str, basis: str, kwargs: dict) -> str:
+        """Build the name of a specification.
+
+        Args:
+            program (str): Program used for the calculation.
+            method (str): Method used for the calculation.
+            basis (str): Basis set used for the calculation.
+            kwargs (dict): Keywords passed to the calculation.
+
+        Returns:
+            Name of the specification
+        """
+        return f"{program}/{method}/{basis}/{hash_keywords(kwargs)}"
+
+    @staticmethod
+    def legacy_spec_name(
+        program: str, method: str, basis: str, kwargs: dict
+    ) -> Optional[str]:
+        """Build the name earlier versions gave a specification, from the raw keywords.
+
+        Args:
+            program (str): Program used for the calculation.
+            method (str): Method used for the calculation.
+            basis (str): Basis set used for the calculation.
+            kwargs (dict): Keywords passed to the calculation.
+
+        Returns:
+            Name of the specification, or None if the keywords are not JSON-serializable
+        """
+        try:
+            kwarg_str = json.dumps(kwargs, sort_keys=True)
+        except TypeError:
+            return None
+        return (
+            f"{program}/{method}/{basis}/{hashlib.md5(kwarg_str.encode()).hexdigest()}"
+        )
+
+    @staticmethod
+    def __key(dataset: BaseDataset) -> tuple:
+        client = getattr(dataset, "_client", None)
+        return (getattr(client, "address", None), dataset.dataset_type, dataset.id)
+
+    def known(self, dataset: BaseDataset) -> set[str]:
+        """Return the cached specification names of a dataset, fetching them once.
+
+        Args:
+            dataset (BaseDataset): Dataset to look up.
+
+        Returns:
+            Set of specification names
+        """
+        key = self.__key(dataset)
+        if key not in self.__known:
+            self.__known[key] = set(dataset.specification_names)
+        return self.__known[key]
+
+    def add(
+        self,
+        dataset: BaseDataset,
+        name: str,
+        specification: Any,
+        legacy_name: Optional[str] = None,
+    ) -> str:
+        """Add a specification to a dataset unless it is already known.
+
+        Args:
+            dataset (BaseDataset): Dataset to add the specification to.
+            name (str): Name of the specification.
+            specification (Any): Specification to add.
+            legacy_name (str): Name the specification may already have in the dataset,
+                from before `name` was used (see `legacy_spec_name`).
+
+        Returns:
+            Name of the specification in the dataset
+        """
+        known = self.known(dataset)
+        if name in known:
+            return name
+        if legacy_name is not None and legacy_name in known:
+            return legacy_name
+
+        dataset.add_specification(name=name, specification=specification)
+        known.add(name)
+        return name
+
+    def invalidate(self, dataset: Optional[BaseDataset] = None) -> None:
+        """Drop cached specification names.
+
+        Args:
+            dataset (BaseDataset): Dataset to forget, default all datasets.
+
+        Returns:
+            None
+        """
+        if dataset is None:
+            self.__known.clear()
+        else:
+            self.__known.pop(self.__key(dataset), None)
+
+
+# shared by every QCA wrapper
+registry = SpecificationRegistry()
@@ -0,0 +1,239 @@
+import json
+
+from qcportal import PortalClient
+from qcportal.dataset_models import BaseDataset, DatasetFetchRecordsBody
+from qcportal.record_models import RecordStatusEnum
+from typing import Iterator, Optional
+
+
+def _as_list(value) -> Optional[list]:
+    if value is None:
+        return None
+    if isinstance(value, (str, RecordStatusEnum)):
+        return [value]
+    return list(value)
+
+
+class StatusReport:
+    """Record counts of a dataset broken down by (specification, status)."""
+
+    def __init__(self, dataset: str, counts: dict[str, dict[str, int]]):
+        self.__dataset = dataset
+        self.__counts = {
+            spec: {RecordStatusEnum(k).value: v for k, v in statuses.items()}
+            for spec, statuses in counts.items()
+        }
+
+    @property
+    def dataset(self) -> str:
+        return self.__dataset
+
+    @property
+    def counts(self) -> dict[str, dict[str, int]]:
+        return self.__counts
+
+    @property
+    def statuses(self) -> list[RecordStatusEnum]:
+        present = {s for statuses in self.__counts.values() for s in statuses}
+        return [s for s in RecordStatusEnum if s.value in present]
+
+    def total(
+        self,
+        status: Optional[str | list[str]] = None,
+        specs: Optional[str | list[str]] = None,
+    ) -> int:
+        """Count records, optionally only in the given status(es) and specification(s).
+
+        Args:
+            status (str | list(str)): Status(es) to count, default all.
+            specs (str | list(str)): Specification(s) to count, default all.
+
+        Returns:
+            Number of records
+        """
+        status = _as_list(status)
+        if status is not None:
+            status = {RecordStatusEnum(s).value for s in status}
+        specs = _as_list(specs)
+
+        return sum(
+            n
+            for spec, statuses in self.__counts.items()
+            if specs is None or spec in specs
+            for s, n in statuses.items()
+            if status is None or s in status
+        )
+
+    def to_records(self) -> list[dict]:
+        """Flatten the counts into one row per (specification, status)."""
+        return [
+            {"dataset": self.__dataset, "specification": spec, "status": s, "count": n}
+            for spec, statuses in sorted(self.__counts.items())
+            for s, n in statuses.items()
+        ]
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """Serialize the report, writing it to `path` if given.
+
+        Args:
+            path (str): File to write the JSON to, default None.
+
+        Returns:
+            JSON string of the report
+        """
+        json_str = json.dumps(
+            {"dataset": self.__dataset, "counts": self.__counts}, sort_keys=True
+        )
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(json_str)
+        return json_str
+
+    def to_dataframe(self):
+        """Return the flattened counts as a pandas DataFrame."""
+        import pandas as pd
+
+        return pd.DataFrame(
+            self.to_records(), columns=["dataset", "specification", "status", "count"]
+        )
+
+    def table(self) -> str:
+        """Return the counts as a table, one row per specification."""
+        from tabulate import tabulate
+
+        headers = ["specification"] + [s.value for s in self.statuses]
+        rows = [
+            [spec] + [statuses.get(s, "") for s in headers[1:]]
+            for spec, statuses in sorted(self.__counts.items())
+        ]
+        return tabulate(rows, headers=headers, stralign="right")
+
+
+def dataset_status(
+    dataset: BaseDataset, specs: Optional[str | list[str]] = None
+) -> StatusReport:
+    """Get the record counts of a dataset, computed on the server.
+
+    Args:
+        dataset (BaseDataset): Dataset to check.
+        specs (str | list(str)): Specification(s) to report, default all.
+
+    Returns:
+        StatusReport of the dataset
+    """
+    specs = _as_list(specs)
+    counts = {
+        spec: statuses
+        for spec, statuses in dataset.status().items()
+        if specs is None or spec in specs
+    }
+    return StatusReport(dataset.name, counts)
+
+
+def iterate_record_ids(
+    client: PortalClient,
+    dataset: BaseDataset,
+    status: Optional[str | list[str]] = None,
+    specs: Optional[str | list[str]] = None,
+    page_size: Optional[int] = None,
+) -> Iterator[tuple[str, str, int]]:
+    """Stream (entry name, specification name, record id) of a dataset's records.
+
+    Only ids are transferred. When `status` is given, the entries in that status are
+    found from the dataset's detailed status first, so only those entries are paged.
+
+    Args:
+        client (PortalClient): Client the dataset belongs to.
+        dataset (BaseDataset): Dataset to query.
+        status (str | list(str)): Only yield records in these status(es), default all.
+        specs (str | list(str)): Specification(s) to query, default all.
+        page_size (int): Number of entries per request, default the server limit.
+
+    Yields:
+        Tuples of (entry name, specification name, record id)
+    """
+    status = _as_list(status)
+    if status is not None:
+        status = [RecordStatusEnum(s) for s in status]
+    specs = _as_list(specs)
+    if specs is None:
+        specs = dataset.specification_names
+
+    if status is None:
+        entries = {spec: list(dataset.entry_names) for spec in specs}
+    else:
+        entries = {spec: [] for spec in specs}
+        for entry, spec, rec_status in dataset.detailed_status():
+            if spec in entries and rec_status in status:
+                entries[spec].append(entry)
+
+    yield from fetch_record_ids(client, dataset, entries, status, page_size)
+
+
+def iterate_record_ids_by_status(
+    client: PortalClient,
+    dataset: BaseDataset,
+    specs: Optional[str | list[str]] = None,
+    page_size: Optional[int] = None,
+) -> Iterator[tuple[RecordStatusEnum, str, str, int]]:
+    """Stream the record ids of a dataset grouped by status, from one detailed status.
+
+    Args:
+        client (PortalClient): Client the dataset belongs to.
+        dataset (BaseDataset): Dataset to query.
+        specs (str | list(str)): Specification(s) to query, default all.
+        page_size (int): Number of entries per request, default the server limit.
+
+    Yields:
+        Tuples of (status, entry name, specification name, record id), by status
+    """
+    specs = _as_list(specs)
+    by_status = {}
+    for entry, spec, rec_status in dataset.detailed_status():
+        if specs is None or spec in specs:
+            by_status.setdefault(rec_status, {}).setdefault(spec, []).append(entry)
+
+    for status in RecordStatusEnum:
+        if status in by_status:
+            for entry, spec, rec_id in fetch_record_ids(
+                client, dataset, by_status[status], status, page_size
+            ):
+                yield status, entry, spec, rec_id
+
+
+def fetch_record_ids(
+    client: PortalClient,
+    dataset: BaseDataset,
+    entries: dict[str, list[str]],
+    status: Optional[str | list[str]] = None,
+    page_size: Optional[int] = None,
+) -> Iterator[tuple[str, str, int]]:
+    """Page the record ids of the given entries of each specification.
+
+    Args:
+        client (PortalClient): Client the dataset belongs to.
+        dataset (BaseDataset): Dataset to query.
+        entries (dict): Specification name to the entry names to look up.
+        status (str | list(str)): Only yield records in these status(es), default all.
+        page_size (int): Number of entries per request, default the server limit.
+
+    Yields:
+        Tuples of (entry name, specification name, record id)
+    """
+    status = _as_list(status)
+    if status is not None:
+        status = [RecordStatusEnum(s) for s in status]
+    if page_size is None:
+        page_size = client.api_limits.get("get_records", 1000)
+
+    endpoint = f"{dataset._base_url}/records/bulkFetch"
+    for spec, spec_entries in entries.items():
+        for i in range(0, len(spec_entries), page_size):
+            body = DatasetFetchRecordsBody(
+                entry_names=spec_entries[i : i + page_size],
+                specification_names=[spec],
+                status=status,
+            )
+            yield from client.make_request(
+                "post", endpoint, list[tuple[str, str, int]], body=body
+            )
@@ -0,0 +1,175 @@
+import numpy as np
+
+from qcportal import PortalClient
+from typing import Callable
+
+
+class TrajectorySet:
+    """Optimization trajectories packed into flat arrays with CSR-style offsets.
+
+    Steps of optimization `i` are `step_offsets[i]:step_offsets[i + 1]` of
+    `energies`/`grad_norms`, and its coordinates are the rows
+    `coord_offsets[i]:coord_offsets[i + 1]` of `coords`, which reshape to
+    `(n_steps, n_atoms, 3)`.
+    """
+
+    def __init__(
+        self,
+        record_ids: np.ndarray,
+        n_atoms: np.ndarray,
+        step_offsets: np.ndarray,
+        coords: np.ndarray,
+        energies: np.ndarray,
+        grad_norms: np.ndarray,
+    ):
+        self.record_ids = np.asarray(record_ids, dtype=np.int64)
+        self.n_atoms = np.asarray(n_atoms, dtype=np.int64)
+        self.step_offsets = np.asarray(step_offsets, dtype=np.int64)
+        self.coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+        self.energies = np.asarray(energies, dtype=np.float64)
+        self.grad_norms = np.asarray(grad_norms, dtype=np.float64)
+
+        self.coord_offsets = np.zeros(len(self.record_ids) + 1, dtype=np.int64)
+        np.cumsum(self.n_steps * self.n_atoms, out=self.coord_offsets[1:])
+
+    @property
+    def n_steps(self) -> np.ndarray:
+        return np.diff(self.step_offsets)
+
+    def __len__(self) -> int:
+        return len(self.record_ids)
+
+    def __getitem__(self, i: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the coordinates (n_steps, n_atoms, 3), energies and gradient norms of one optimization."""
+        start, stop = self.step_offsets[i], self.step_offsets[i + 1]
+        coords = self.coords[self.coord_offsets[i] : self.coord_offsets[i + 1]]
+        return (
+            coords.reshape(stop - start, self.n_atoms[i], 3),
+            self.energies[start:stop],
+            self.grad_norms[start:stop],
+        )
+
+    def _step_atoms(self) -> tuple[np.ndarray, np.ndarray]:
+        # number of atoms of each step and the row of `coords` where it starts
+        atoms = np.repeat(self.n_atoms, self.n_steps)
+        starts = np.zeros(len(atoms), dtype=np.int64)
+        np.cumsum(atoms[:-1], out=starts[1:])
+        return atoms, starts
+
+    def step_descriptor(self, func: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        """Evaluate a per-step descriptor over every step of every trajectory.
+
+        Steps with the same number of atoms are passed to `func` together, in one call per
+        distinct atom count.
+
+        Args:
+            func (Callable): Maps coordinates (n_steps, n_atoms, 3) to an array (n_steps,).
+
+        Returns:
+            Array aligned with `energies`
+        """
+        out = np.empty(len(self.energies))
+        atoms, starts = self._step_atoms()
+        for n in np.unique(atoms):
+            steps = np.flatnonzero(atoms == n)
+            rows = starts[steps, None] + np.arange(n)
+            out[steps] = func(self.coords[rows])
+        return out
+
+    def avg_radius(self) -> np.ndarray:
+        """Average radius of every step, aligned with `energies`."""
+        out = np.zeros(len(self.energies))
+        atoms, starts = self._step_atoms()
+        steps = np.flatnonzero(atoms)
+        if len(steps) == 0:
+            return out
+
+        starts, atoms = starts[steps], atoms[steps]
+        centers = np.add.reduceat(self.coords, starts, axis=0) / atoms[:, None]
+        centered = self.coords - np.repeat(centers, atoms, axis=0)
+        sq = np.add.reduceat(np.square(centered).sum(axis=1), starts)
+        out[steps] = np.sqrt(sq / atoms)
+        return out
+
+    def save(self, path: str) -> None:
+        """Save the packed arrays to an `.npz` file."""
+        np.savez(
+            path,
+            record_ids=self.record_ids,
+            n_atoms=self.n_atoms,
+            step_offsets=self.step_offsets,
+            coords=self.coords,
+            energies=self.energies,
+            grad_norms=self.grad_norms,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "TrajectorySet":
+        """Load packed arrays saved with `save`."""
+        with np.load(path) as data:
+            return cls(
+                data["record_ids"],
+                data["n_atoms"],
+                data["step_offsets"],
+                data["coords"],
+                data["energies"],
+                data["grad_norms"],
+            )
+
+
+def load_trajectories(
+    client: PortalClient, record_ids: list[int], batch_size: int = 100
+) -> TrajectorySet:
+    """Fetch optimization trajectories in batches and pack them into a TrajectorySet.
+
+    Each batch fetches the optimizations together with their trajectory steps and step
+    molecules, which are converted to arrays and dropped before the next batch.
+
+    Args:
+        client (PortalClient): Client the optimizations belong to.
+        record_ids (list(int)): Ids of optimization records.
+        batch_size (int): Number of optimizations fetched per batch.
+
+    Returns:
+        TrajectorySet of the optimizations, in the order of `record_ids`
+    """
+    n_atoms = np.zeros(len(record_ids), dtype=np.int64)
+    step_offsets = np.zeros(len(record_ids) + 1, dtype=np.int64)
+    coords, energies, grad_norms = [], [], []
+
+    for i in range(0, len(record_ids), batch_size):
+        opts = client.get_optimizations(
+            record_ids[i : i + batch_size], include=["trajectory", "molecule"]
+        )
+        for j, opt in enumerate(opts, start=i):
+            steps = opt.trajectory_records_ or []
+            if steps:
+                n_atoms[j] = len(steps[0].molecule.symbols)
+
+            step_energies = np.full(len(steps), np.nan)
+            step_gnorms = np.full(len(steps), np.nan)
+            for k, sp in enumerate(steps):
+                props = sp.properties or {}
+                if props.get("return_energy") is not None:
+                    step_energies[k] = props["return_energy"]
+                if props.get("return_gradient") is not None:
+                    step_gnorms[k] = np.linalg.norm(props["return_gradient"])
+            if opt.energies is not None and len(opt.energies) == len(steps):
+                step_energies = np.asarray(opt.energies, dtype=np.float64)
+
+            if steps:
+                coords.append(
+                    np.stack([sp.molecule.geometry for sp in steps]).reshape(-1, 3)
+                )
+            energies.append(step_energies)
+            grad_norms.append(step_gnorms)
+            step_offsets[j + 1] = step_offsets[j] + len(steps)
+
+    return TrajectorySet(
+        record_ids,
+        n_atoms,
+        step_offsets,
+        np.concatenate(coords) if coords else np.empty((0, 3)),
+        np.concatenate(energies) if energies else np.empty(0),
+        np.concatenate(grad_norms) if grad_norms else np.empty(0),
+    )
@@ -0,0 +1,141 @@
+import asyncio
+import random
+import threading
+import time
+
+from qcportal.record_models import RecordStatusEnum
+from typing import Iterator, Optional
+
+FINISHED_STATUSES = [
+    RecordStatusEnum.complete,
+    RecordStatusEnum.error,
+    RecordStatusEnum.cancelled,
+    RecordStatusEnum.invalid,
+    RecordStatusEnum.deleted,
+]
+
+
+class Backoff:
+    """Exponential backoff with jitter between status polls."""
+
+    def __init__(
+        self,
+        initial: float = 5.0,
+        maximum: float = 300.0,
+        factor: float = 2.0,
+        jitter: float = 0.1,
+    ):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self.__delay = initial
+
+    def reset(self) -> None:
+        """Go back to the initial delay, e.g. after progress was made."""
+        self.__delay = self.initial
+
+    def next(self) -> float:
+        """Return the next delay in seconds and grow the delay for the one after."""
+        delay = self.__delay * (1 + random.uniform(-self.jitter, self.jitter))
+        self.__delay = min(self.__delay * self.factor, self.maximum)
+        return max(delay, 0.0)
+
+
+class Sleep:
+    """Yielded by polling steps where the driver should wait before the next poll."""
+
+    __slots__ = ("n_pending",)
+
+    def __init__(self, n_pending: int):
+        self.n_pending = n_pending
+
+
+class Poller:
+    """Sleeps between polls, enforcing a deadline and watching for cancellation."""
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        stop: Optional[threading.Event] = None,
+        backoff: Optional[Backoff] = None,
+    ):
+        self.__deadline = None if timeout is None else time.monotonic() + timeout
+        self.__stop = stop
+        self.backoff = backoff if backoff is not None else Backoff()
+
+    @property
+    def stopped(self) -> bool:
+        return self.__stop is not None and self.__stop.is_set()
+
+    def check(self, n_pending: int) -> None:
+        """Raise TimeoutError if the deadline has passed.
+
+        Args:
+            n_pending (int): Number of records still pending, used in the timeout error.
+
+        Returns:
+            None
+        """
+        if self.__deadline is not None and time.monotonic() >= self.__deadline:
+            raise TimeoutError(f"Timed out with {n_pending} records still pending")
+
+    def next_delay(self) -> float:
+        """Return the delay before the next poll, cut short at the deadline."""
+        delay = self.backoff.next()
+        if self.__deadline is not None:
+            delay = min(delay, max(self.__deadline - time.monotonic(), 0.0))
+        return delay
+
+    def sleep(self, n_pending: int) -> bool:
+        """Wait before the next poll.
+
+        Args:
+            n_pending (int): Number of records still pending, used in the timeout error.
+
+        Returns:
+            False if waiting was cancelled, True otherwise
+        """
+        self.check(n_pending)
+        delay = self.next_delay()
+        if self.__stop is not None:
+            return not self.__stop.wait(delay)
+        time.sleep(delay)
+        return True
+
+    async def async_sleep(self, n_pending: int) -> bool:
+        """Like sleep, but on the event loop instead of blocking a thread.
+
+        Args:
+            n_pending (int): Number of records still pending, used in the timeout error.
+
+        Returns:
+            False if waiting was cancelled, True otherwise
+        """
+        self.check(n_pending)
+        deadline = time.monotonic() + self.next_delay()
+        # the stop event is a threading.Event, so it is checked at least every second
+        while not self.stopped:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            await asyncio.sleep(min(remaining, 1.0))
+        return False
+
+
+def poll(steps: Iterator, poller: Poller) -> Iterator:
+    """Run polling steps, sleeping in this thread wherever they yield Sleep.
+
+    Args:
+        steps (Iterator): Generator yielding results and Sleep markers.
+        poller (Poller): Poller enforcing the schedule, deadline and cancellation.
+
+    Yields:
+        The results of the steps
+    """
+    for item in steps:
+        if isinstance(item, Sleep):
+            if not poller.sleep(item.n_pending):
+                return
+        else:
+            yield item
@@ -0,0 +1,107 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from mypy_tools.misc.geometry import (
+    connected_components,
+    enumerate_nmers,
+    max_nmer_order,
+    nmer_molecules,
+    pairs_within,
+)
+
+
+def _distances(geometry):
+    return np.linalg.norm(geometry[:, None] - geometry[None], axis=-1)
+
+
+def _brute_pairs(geometry, cutoff):
+    d = _distances(geometry)
+    return {
+        (i, j)
+        for i, j in itertools.combinations(range(len(geometry)), 2)
+        if d[i, j] <= cutoff
+    }
+
+
+def _brute_components(n, pairs):
+    labels = list(range(n))
+    changed = True
+    while changed:
+        changed = False
+        for i, j in pairs:
+            low = min(labels[i], labels[j])
+            if labels[i] != low or labels[j] != low:
+                labels[i] = labels[j] = low
+                changed = True
+    groups = {}
+    for i, label in enumerate(labels):
+        groups.setdefault(label, []).append(i)
+    return sorted(groups.values())
+
+
+def _brute_nmers(geometry, fragments, n, cutoff):
+    d = _distances(geometry)
+    close = [[d[np.ix_(a, b)].min() <= cutoff for b in fragments] for a in fragments]
+    return [
+        nmer
+        for nmer in itertools.combinations(range(len(fragments)), n)
+        if all(close[a][b] for a, b in itertools.combinations(nmer, 2))
+    ]
+
+
+@pytest.fixture(params=[0, 1, 2])
+def cloud(request):
+    return np.random.default_rng(request.param).uniform(0.0, 12.0, size=(60, 3))
+
+
+@pytest.mark.parametrize("cutoff", [0.5, 2.0, 4.0])
+def test_pairs_within(cloud, cutoff):
+    i, j = pairs_within(cloud, cutoff)
+    found = set(zip(np.minimum(i, j).tolist(), np.maximum(i, j).tolist()))
+    assert len(found) == len(i)
+    assert found == _brute_pairs(cloud, cutoff)
+
+
+@pytest.mark.parametrize("cutoff", [1.0, 2.0, 3.0])
+def test_connected_components(cloud, cutoff):
+    i, j = pairs_within(cloud, cutoff)
+    labels = connected_components(len(cloud), i, j)
+    components = sorted(
+        np.flatnonzero(labels == k).tolist() for k in range(labels.max() + 1)
+    )
+    assert components == _brute_components(len(cloud), _brute_pairs(cloud, cutoff))
+
+
+@pytest.mark.parametrize("n", [2, 3, 4])
+@pytest.mark.parametrize("cutoff", [2.0, 4.0])
+def test_enumerate_nmers(cloud, n, cutoff):
+    fragments = [np.arange(k, k + 3) for k in range(0, len(cloud), 3)]
+    expected = _brute_nmers(cloud, fragments, n, cutoff)
+    assert enumerate_nmers(cloud, fragments, n, cutoff) == expected
+
+    orders = [m for m in range(2, 6) if _brute_nmers(cloud, fragments, m, cutoff)]
+    assert max_nmer_order(cloud, fragments, 5, cutoff) == max(orders, default=1)
+
+
+def test_nmer_molecules_fragment_charges():
+    # Na+ Cl- and a distant water
+    symbols = ["Na", "Cl", "O", "H", "H"]
+    geometry = [
+        [0.0, 0.0, 0.0],
+        [8.0, 0.0, 0.0],
+        [0.0, 8.0, 0.0],
+        [0.0, 8.96, 0.0],
+        [0.93, 7.76, 0.0],
+    ]
+    dimers = nmer_molecules(symbols, geometry, 2, 12.0, fragment_charges=[1, -1, 0])
+
+    charges = sorted((list(m.fragment_charges), m.molecular_charge) for m in dimers)
+    assert charges == [([-1.0, 0.0], -1.0), ([1.0, -1.0], 0.0), ([1.0, 0.0], 1.0)]
+
+
+@pytest.mark.parametrize("cutoff", [0.0, -1.0])
+def test_pairs_within_bad_cutoff(cloud, cutoff):
+    with pytest.raises(ValueError):
+        pairs_within(cloud, cutoff)
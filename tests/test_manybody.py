@@ -0,0 +1,82 @@
+import pytest
+
+from unittest import mock
+
+from mypy_tools.qca import ManybodyQCA, SpecificationRegistry
+
+
+class FakeDataset:
+    dataset_type = "manybody"
+
+    def __init__(self, dataset_id, specification_names=()):
+        self.id = dataset_id
+        self.specification_names = list(specification_names)
+        self.added = []
+
+    def add_specification(self, name, specification):
+        self.added.append(name)
+        self.specification_names.append(name)
+
+
+@pytest.fixture
+def qca():
+    with mock.patch("mypy_tools.qca.base.PortalClient", lambda *args, **kwargs: None):
+        qca = ManybodyQCA("fake", 0, "user", "password")
+    qca.registry = SpecificationRegistry()
+    return qca
+
+
+def spec_name(qca, levels=None, bsse_correction=None, **kwargs):
+    return qca.dataset_add_specification(
+        FakeDataset(0),
+        "psi4",
+        "hf",
+        "sto-3g",
+        levels=levels,
+        bsse_correction=bsse_correction,
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize(
+    "levels, bsse_correction",
+    [
+        (2, None),
+        ({1: {}, 2: {}}, None),
+        (None, "cp"),
+        (2, ["CP"]),
+        ({1: {"method": "hf"}, 2: {"basis": "sto-3g"}}, None),
+    ],
+)
+def test_default_equivalent_spec_name(qca, levels, bsse_correction):
+    legacy = SpecificationRegistry.legacy_spec_name(
+        "psi4", "hf", "sto-3g", {"scf_type": "df"}
+    )
+    assert spec_name(qca, scf_type="df") == legacy
+    assert spec_name(qca, levels, bsse_correction, scf_type="df") == legacy
+
+
+@pytest.mark.parametrize(
+    "levels, bsse_correction",
+    [
+        (3, None),
+        (1, None),
+        (None, "nocp"),
+        (None, ["cp", "vmfc"]),
+        ({1: {}, 2: {"method": "mp2"}}, None),
+        ({1: {}, 2: {}, "supersystem": {}}, None),
+    ],
+)
+def test_distinct_spec_name(qca, levels, bsse_correction):
+    names = {spec_name(qca), spec_name(qca, levels, bsse_correction)}
+    assert len(names) == 2
+    assert spec_name(qca, levels, bsse_correction) in names
+
+
+def test_explicit_default_levels_reuse_legacy_spec(qca):
+    legacy = SpecificationRegistry.legacy_spec_name("psi4", "hf", "sto-3g", {})
+    dataset = FakeDataset(1, [legacy])
+
+    name = qca.dataset_add_specification(dataset, "psi4", "hf", "sto-3g", levels=2)
+    assert name == legacy
+    assert dataset.added == []
@@ -0,0 +1,70 @@
+import pytest
+
+from mypy_tools.qca.specification import SpecificationRegistry, hash_keywords
+
+# names given by the json.dumps(kwargs, sort_keys=True) hash of earlier versions
+LEGACY = [
+    ({"scf_type": "DF"}, "65b0add07e89acfdfbb18433bf5944ca"),
+    ({"e_convergence": 10.0}, "55edb5c02023a41e719ccb6784ccc68a"),
+    ({"basis_guess": "3-21G"}, "66413e636a4ba0b7e004c394151d810c"),
+    ({"maxiter": 100, "scf_type": "df"}, "6da00b85f5c31772082b01b280c64386"),
+    ({}, "99914b932bd37a50b983c5e7c90ae93b"),
+]
+
+
+class FakeDataset:
+    dataset_type = "singlepoint"
+
+    def __init__(self, dataset_id, specification_names=()):
+        self.id = dataset_id
+        self.specification_names = list(specification_names)
+        self.added = []
+
+    def add_specification(self, name, specification):
+        self.added.append(name)
+        self.specification_names.append(name)
+
+
+@pytest.mark.parametrize("kwargs, digest", LEGACY)
+def test_legacy_spec_name(kwargs, digest):
+    name = SpecificationRegistry.legacy_spec_name("psi4", "hf", "sto-3g", kwargs)
+    assert name == f"psi4/hf/sto-3g/{digest}"
+
+
+@pytest.mark.parametrize("kwargs, digest", LEGACY)
+def test_add_reuses_legacy_name(kwargs, digest):
+    legacy = f"psi4/hf/sto-3g/{digest}"
+    dataset = FakeDataset(1, [legacy])
+    registry = SpecificationRegistry()
+
+    name = registry.add(
+        dataset,
+        registry.spec_name("psi4", "hf", "sto-3g", kwargs),
+        object(),
+        registry.legacy_spec_name("psi4", "hf", "sto-3g", kwargs),
+    )
+    assert name == legacy
+    assert dataset.added == []
+
+
+def test_add_new_spec():
+    dataset = FakeDataset(2)
+    registry = SpecificationRegistry()
+    kwargs = {"SCF_TYPE": "DF"}
+
+    name = registry.spec_name("psi4", "hf", "sto-3g", kwargs)
+    legacy = registry.legacy_spec_name("psi4", "hf", "sto-3g", kwargs)
+    assert registry.add(dataset, name, object(), legacy) == name
+    assert registry.add(dataset, name, object(), legacy) == name
+    assert dataset.added == [name]
+
+
+def test_hash_keywords():
+    # flat lowercase keywords keep their legacy hash
+    for kwargs, digest in LEGACY:
+        assert hash_keywords(kwargs) == digest
+    # keys are case-insensitive, values are not
+    assert hash_keywords({"SCF_TYPE": "DF"}) == hash_keywords({"scf_type": "DF"})
+    assert hash_keywords({"path": "/A/b"}) != hash_keywords({"path": "/a/b"})
+    # nested keywords and float noise
+    assert hash_keywords({"a": {"B": 0.1 + 0.2}}) == hash_keywords({"a": {"b": 0.3}})